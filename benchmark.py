@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from training import DEFAULT_SEED, build_model, new_tracker, split_data
+
+DEFAULT_BATCH_SIZES = [1, 32, 256, 4096]
+DEFAULT_TREE_COUNTS = [10, 50, 100, 200]
+
+# Batch size 1 is slow for big forests, so each measurement is capped
+MAX_BATCHES = 2000
+
+
+# Throughput and emissions of model.predict over X at one batch size,
+# measured with its own tracker (not persisted: these are sub-measurements,
+# not runs)
+def measure_inference(model, X, batch_size):
+    n_batches = min(-(-len(X) // batch_size), MAX_BATCHES)
+    n_predictions = min(len(X), n_batches * batch_size)
+
+    tracker = new_tracker(persist=False)
+    tracker.start()
+    started = time.perf_counter()
+    try:
+        for start in range(0, n_predictions, batch_size):
+            model.predict(X[start:start + batch_size])
+    finally:
+        emissions_kg = tracker.stop()
+    duration_s = time.perf_counter() - started
+
+    return {
+        "Batch Size": batch_size,
+        "Predictions": n_predictions,
+        "Predictions/sec": n_predictions / duration_s,
+        "Energy per 1k Predictions (kWh)": tracker.final_emissions_data.energy_consumed / n_predictions * 1000,
+        "Emissions per 1k Predictions (g CO₂eq)": emissions_kg * 1000 / n_predictions * 1000,
+    }
+
+
+# Fit a model on the dataset's training split (untracked: only inference is measured here)
+def _fit(dataset_name, model_type, params, n_jobs=None):
+    X_train, _, y_train, _ = split_data(dataset_name)
+    return build_model(model_type, params, DEFAULT_SEED, n_jobs).fit(X_train, y_train)
+
+
+# Test split tiled `replicate` times, to get production-sized inference volumes
+def _inference_data(dataset_name, replicate):
+    _, X_test, _, _ = split_data(dataset_name)
+    return np.tile(X_test, (replicate, 1))
+
+
+# Inference benchmark for one config across batch sizes, plus how the Random
+# Forest's tree count moves per-prediction cost compared with Logistic Regression
+def inference_report(dataset_name, model_type, params, batch_sizes=DEFAULT_BATCH_SIZES,
+                     replicate=10, tree_counts=DEFAULT_TREE_COUNTS, comparison_batch_size=256, n_jobs=None):
+    X = _inference_data(dataset_name, replicate)
+
+    model = _fit(dataset_name, model_type, params, n_jobs)
+    batches = pd.DataFrame([measure_inference(model, X, batch_size) for batch_size in batch_sizes])
+
+    rows = []
+    for n_estimators in tree_counts:
+        forest = _fit(dataset_name, "Random Forest", {"n_estimators": n_estimators}, n_jobs)
+        rows.append({"Model": "Random Forest", "Trees": n_estimators, **measure_inference(forest, X, comparison_batch_size)})
+    linear = _fit(dataset_name, "Logistic Regression", {"max_iter": 200})
+    linear_row = measure_inference(linear, X, comparison_batch_size)
+    # The linear model has no trees; repeat it across the axis as a reference line
+    for n_estimators in tree_counts:
+        rows.append({"Model": "Logistic Regression", "Trees": n_estimators, **linear_row})
+
+    return {"batches": batches, "trees": pd.DataFrame(rows)}
@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from training import PHASES, new_tracker, track_phase
+
+DEFAULT_RUNS = 10
+CONFIDENCE = 0.95
+
+
+# One empty tracked block, measured exactly like a train_model run (tracker
+# start, one task per phase, stop) but with no work inside, so what it reports
+# is the tracker's own overhead on this host.
+def _empty_run():
+    tracker = new_tracker(persist=False)
+    tracker.start()
+    started = time.perf_counter()
+    phases = []
+    try:
+        for name in PHASES:
+            with track_phase(tracker, name, phases):
+                pass
+    finally:
+        emissions_kg = tracker.stop()
+    return {
+        "Duration (s)": time.perf_counter() - started,
+        "Energy (kWh)": tracker.final_emissions_data.energy_consumed,
+        "Emissions (g CO₂eq)": emissions_kg * 1000,
+    }
+
+
+# Measure n_runs empty blocks. The first run in a process also starts the
+# tracker service, which later runs don't pay for, so one warm-up block is discarded.
+def calibrate(n_runs=DEFAULT_RUNS):
+    _empty_run()
+    samples = pd.DataFrame([{"Run": i + 1, **_empty_run()} for i in range(n_runs)])
+    emissions = samples["Emissions (g CO₂eq)"]
+    return {
+        "samples": samples,
+        "n_runs": n_runs,
+        "mean_g": emissions.mean(),
+        "std_g": emissions.std(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+# Emissions of a run minus the tracker overhead, with a confidence interval.
+# The overhead of a single run is uncertain by a prediction interval around the
+# calibration mean, so the bounds widen by sqrt(1 + 1/n). Values are clipped
+# at zero. gross_g may be a number or a Series of runs.
+def net_emissions(gross_g, calibration, confidence=CONFIDENCE):
+    n = calibration["n_runs"]
+    half_width = stats.t.ppf((1 + confidence) / 2, n - 1) * calibration["std_g"] * (1 + 1 / n) ** 0.5
+    net_g = gross_g - calibration["mean_g"]
+    return {
+        "net_g": np.maximum(net_g, 0.0),
+        "low_g": np.maximum(net_g - half_width, 0.0),
+        "high_g": np.maximum(net_g + half_width, 0.0),
+        "overhead_share": np.minimum(calibration["mean_g"] / np.maximum(gross_g, 1e-30), 1.0),
+    }
@@ -0,0 +1,69 @@
+import io
+import os
+
+import pandas as pd
+
+# Forecast used when none is uploaded: CSV or JSON of timestamp, intensity
+FORECAST_PATH = os.environ.get("GREENMODEL_CARBON_FORECAST", "carbon_forecast.csv")
+
+
+# Grid carbon-intensity forecast (g CO₂eq/kWh) from a CSV or JSON time series
+# with `timestamp` and `intensity` columns (JSON: a list of such records).
+# Timestamps without a time zone are taken as UTC.
+def load_forecast(source, name=None):
+    name = name or source
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if str(name).lower().endswith(".json"):
+        df = pd.read_json(source)
+    else:
+        df = pd.read_csv(source)
+    missing = {"timestamp", "intensity"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Forecast needs columns 'timestamp' and 'intensity' (missing: {', '.join(sorted(missing))})")
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(df["timestamp"], utc=True),
+        "intensity": df["intensity"].astype(float),
+    })
+    return df.sort_values("timestamp", ignore_index=True)
+
+
+# Forecast intensity in effect at `when`: the latest point at or before it
+# (the first point for times before the forecast starts)
+def intensity_at(forecast, when):
+    position = forecast["timestamp"].searchsorted(when, side="right") - 1
+    return forecast["intensity"].iloc[max(position, 0)]
+
+
+# When a job submitted at `submitted` should start: right away if the grid is
+# already at or below the threshold, else at the first forecast point that is,
+# but never later than the deadline
+def release_time(forecast, submitted, threshold, deadline):
+    if intensity_at(forecast, submitted) <= threshold:
+        return submitted
+    upcoming = forecast[(forecast["timestamp"] > submitted) & (forecast["timestamp"] < deadline)]
+    green = upcoming[upcoming["intensity"] <= threshold]
+    return green["timestamp"].iloc[0] if not green.empty else deadline
+
+
+# Emissions of a job backlog run immediately vs held for green windows. Each job
+# is submitted `spacing` after the previous one, starting when the forecast
+# starts, uses `energy_kwh`, and must start within `max_delay`.
+def simulate_backlog(forecast, n_jobs, energy_kwh, threshold, max_delay, spacing=pd.Timedelta(hours=1)):
+    start = forecast["timestamp"].iloc[0]
+    rows = []
+    for i in range(n_jobs):
+        submitted = start + i * spacing
+        released = release_time(forecast, submitted, threshold, submitted + max_delay)
+        immediate_g = energy_kwh * intensity_at(forecast, submitted)
+        scheduled_g = energy_kwh * intensity_at(forecast, released)
+        rows.append({
+            "Job": i + 1,
+            "Submitted": submitted,
+            "Starts": released,
+            "Delay (h)": (released - submitted) / pd.Timedelta(hours=1),
+            "Immediate (g CO₂eq)": immediate_g,
+            "Scheduled (g CO₂eq)": scheduled_g,
+            "Saved (g CO₂eq)": immediate_g - scheduled_g,
+        })
+    return pd.DataFrame(rows)
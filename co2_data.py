@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import cache_key, default_cache, file_hash
+
+# Our World in Data CO₂ dataset, and the compact copy the dashboard reads
+RAW_CSV = "data/countries_co2_data.csv"
+PARQUET_PATH = "data/countries_co2_data.parquet"
+
+# Columns kept from the raw file (when present); values are stored as float32
+KEY_COLUMNS = ["country", "year", "iso_code"]
+VALUE_COLUMNS = ["co2", "population", "gdp"]
+
+# Regions and groups listed alongside countries
+AGGREGATES = ["World", "Asia", "Europe", "Africa", "North America", "South America", "European Union", "Oceania"]
+
+# Metrics the dashboard can plot: label -> column (see add_metrics; per-capita
+# and per-GDP only exist when the data has population and gdp)
+METRICS = {
+    "CO₂ (million tonnes)": "co2",
+    "CO₂ per Capita (tonnes)": "co2_per_capita",
+    "CO₂ per GDP (kg per $)": "co2_per_gdp",
+    "Cumulative CO₂ (million tonnes)": "cumulative_co2",
+    "CO₂ Growth (% year over year)": "co2_growth",
+    "CO₂ Rank (1 = largest emitter)": "co2_rank",
+}
+
+
+# Write the compact Parquet copy of the raw CSV: only the needed columns,
+# countries only, categorical country and iso_code, int16 year, float32 values,
+# sorted by country then year (each country's history is contiguous)
+def preprocess(csv_path=RAW_CSV, out_path=PARQUET_PATH):
+    wanted = set(KEY_COLUMNS + VALUE_COLUMNS)
+    df = pd.read_csv(csv_path, usecols=lambda c: c in wanted)
+    df = df[~df["country"].isin(AGGREGATES)]
+    # OWID's other aggregates (income groups, "(GCP)" regions, ...) have no ISO code
+    if "iso_code" in df.columns:
+        df = df[df["iso_code"].notna()]
+    df = df.sort_values(["country", "year"], ignore_index=True)
+    df["year"] = df["year"].astype("int16")
+    for column in ("country", "iso_code"):
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in VALUE_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("float32")
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    return df
+
+
+# True when the Parquet copy is missing or older than the raw CSV
+def is_stale(csv_path=RAW_CSV, out_path=PARQUET_PATH):
+    return not os.path.exists(out_path) or (
+        os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(out_path)
+    )
+
+
+# Rebuild the compact copy if stale and return its version (size, mtime), which
+# changes whenever the data does
+def data_version(csv_path=RAW_CSV, path=PARQUET_PATH):
+    if is_stale(csv_path, path):
+        preprocess(csv_path, path)
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Read the compact copy (rebuilding it first if stale), reading only `columns`
+def load(columns=None, csv_path=RAW_CSV, path=PARQUET_PATH):
+    if is_stale(csv_path, path):
+        preprocess(csv_path, path)
+    return pd.read_parquet(path, columns=columns)
+
+
+# Derived metric columns (see METRICS) for every country and year at once, for
+# data sorted by country and year; computed once so that switching metric or
+# country is only a lookup
+def add_metrics(df):
+    df = df.copy()
+    co2 = df["co2"]  # million tonnes
+    if "population" in df.columns:
+        df["co2_per_capita"] = co2 * 1e6 / df["population"].where(df["population"] > 0)
+    if "gdp" in df.columns:
+        df["co2_per_gdp"] = co2 * 1e9 / df["gdp"].where(df["gdp"] > 0)
+
+    # Running total and change from the previous year, within each country;
+    # growth is only defined when that previous year is present and non-zero
+    df["cumulative_co2"] = co2.fillna(0).groupby(df["country"], observed=True).cumsum()
+    previous = df[["year", "co2"]].groupby(df["country"], observed=True).shift()
+    consecutive = (previous["year"] == df["year"] - 1) & (previous["co2"] > 0)
+    df["co2_growth"] = ((co2 - previous["co2"]) / previous["co2"] * 100).where(consecutive)
+
+    # Position among all countries in the same year, largest emitter first
+    df["co2_rank"] = co2.groupby(df["year"]).rank(method="min", ascending=False)
+    return df
+
+
+# add_metrics over the whole compact copy, kept in the shared disk cache under
+# the copy's content hash so other processes and restarts reuse it
+def load_metrics(csv_path=RAW_CSV, path=PARQUET_PATH):
+    if is_stale(csv_path, path):
+        preprocess(csv_path, path)
+    key = cache_key("co2_metrics", file_hash(path))
+    return default_cache().frame(key, lambda: add_metrics(load(csv_path=csv_path, path=path)))
+
+
+class SeriesIndex:
+    # Lookups the dashboard makes on every interaction, computed once per data
+    # version: each country's rows as a contiguous slice, the top emitters of
+    # each year and the sorted country list.
+
+    def __init__(self, df, top_n=10, value="co2"):
+        df = df.sort_values(["country", "year"], ignore_index=True, kind="stable")
+        df["country"] = df["country"].cat.remove_unused_categories()
+        codes = df["country"].cat.codes.to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(df)]
+        categories = df["country"].cat.categories
+        self.df = df
+        self._slices = {categories[codes[start]]: slice(start, end) for start, end in zip(starts, ends)}
+        self.countries = sorted(self._slices)
+        self.latest_year = int(df["year"].max()) if len(df) else None
+
+        ranked = df.dropna(subset=[value]).sort_values(["year", value], ascending=[True, False])
+        top = ranked.groupby("year", sort=False).head(top_n).astype({"country": str})
+        self._top = {int(year): rows.reset_index(drop=True) for year, rows in top.groupby("year")}
+
+    # One country's rows, oldest first (empty for an unknown country)
+    def series(self, country):
+        return self.df.iloc[self._slices.get(country, slice(0, 0))]
+
+    # Top emitters of a year, largest first
+    def top(self, year):
+        return self._top.get(year, self.df.iloc[0:0])
+
+
+if __name__ == "__main__":
+    df = preprocess()
+    print(f"Wrote {PARQUET_PATH}: {len(df):,} rows, {df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
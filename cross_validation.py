@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+from training import DEFAULT_SEED, build_model, load_data, new_tracker
+from tracker_service import default_service
+
+# Set in each pool worker by _init_worker
+_ready_barrier = None
+
+
+# Pool worker start-up: imports, the process's tracker service (hardware
+# probing, geolocation) and the dataset, all before any fold is measured
+def _init_worker(dataset_name, barrier):
+    global _ready_barrier
+    _ready_barrier = barrier
+    default_service()
+    load_data(dataset_name)
+
+
+# Returns once every worker has started: the barrier needs all of them at once
+def _ready():
+    _ready_barrier.wait()
+
+
+# Process pool whose workers have all finished starting up
+def _warm_pool(n_workers, dataset_name):
+    # spawn keeps workers clear of the parent's tracker and server threads
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=context, initializer=_init_worker,
+        initargs=(dataset_name, context.Barrier(n_workers)),
+    )
+    try:
+        for future in [executor.submit(_ready) for _ in range(n_workers)]:
+            future.result()
+    except BaseException:
+        executor.shutdown(cancel_futures=True)
+        raise
+    return executor
+
+
+# Worker entry point: train and score one fold under its own tracker.
+# Fold trackers don't write rows; the CV run as a whole is logged once.
+def _run_fold(dataset_name, model_type, params, fold, train_idx, test_idx, seed):
+    X, y = load_data(dataset_name)
+    tracker = new_tracker(persist=False)
+    tracker.start()
+    started = time.perf_counter()
+    try:
+        model = build_model(model_type, params, seed)
+        model.fit(X[train_idx], y[train_idx])
+        acc = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+    finally:
+        emissions_kg = tracker.stop()
+
+    return {
+        "Fold": fold,
+        "Accuracy (%)": acc * 100,
+        "Duration (s)": time.perf_counter() - started,
+        "Energy (kWh)": tracker.final_emissions_data.energy_consumed,
+        "Emissions (g CO₂eq)": emissions_kg * 1000,
+    }
+
+
+# k-fold CV with folds run sequentially (max_workers=1) or in a process pool.
+# An outer tracker measures the whole strategy, which is what parallel and
+# sequential execution should be compared on; overlapping fold trackers each see
+# the whole machine, so their sum over-counts in parallel. Pool workers are
+# started (imports, tracker set-up, data) before the outer tracker starts, as
+# the sequential run already has all of that in this process.
+def cross_validate(dataset_name, model_type, params, k=5, max_workers=None, seed=DEFAULT_SEED):
+    X, y = load_data(dataset_name)
+    folds = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=seed).split(X, y))
+    jobs = [(dataset_name, model_type, params, i + 1, train_idx, test_idx, seed) for i, (train_idx, test_idx) in enumerate(folds)]
+
+    tracker = new_tracker()
+    executor = None
+    if max_workers != 1:
+        executor = _warm_pool(min(max_workers or os.cpu_count() or 1, len(jobs)), dataset_name)
+    tracker.start()
+    started = time.perf_counter()
+    try:
+        if executor is None:
+            rows = [_run_fold(*job) for job in jobs]
+        else:
+            rows = list(executor.map(_run_fold, *zip(*jobs)))
+    finally:
+        emissions_kg = tracker.stop()
+        wall_time_s = time.perf_counter() - started
+        if executor is not None:
+            executor.shutdown()
+
+    df_folds = pd.DataFrame(rows)
+    return {
+        "folds": df_folds,
+        "mean_accuracy": df_folds["Accuracy (%)"].mean(),
+        "std_accuracy": df_folds["Accuracy (%)"].std(),
+        "wall_time_s": wall_time_s,
+        "energy_kwh": tracker.final_emissions_data.energy_consumed,
+        "emissions_g": emissions_kg * 1000,
+    }
+
+
+# Run the same CV both ways and summarise what parallelism costs or saves
+def compare_cv_strategies(dataset_name, model_type, params, k=5, max_workers=None):
+    parallel = cross_validate(dataset_name, model_type, params, k, max_workers)
+    sequential = cross_validate(dataset_name, model_type, params, k, max_workers=1)
+    strategies = pd.DataFrame([
+        {"Strategy": name, "Wall Time (s)": run["wall_time_s"], "Energy (kWh)": run["energy_kwh"], "Emissions (g CO₂eq)": run["emissions_g"]}
+        for name, run in (("Parallel", parallel), ("Sequential", sequential))
+    ])
+    return {**parallel, "strategies": strategies}
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+
+# Directory of the shared cache (empty disables it) and its size limit; once it
+# grows past the limit, the least recently used entries are removed
+CACHE_DIR = os.environ.get("GREENMODEL_CACHE_DIR", ".cache")
+MAX_BYTES = int(os.environ.get("GREENMODEL_CACHE_MAX_BYTES", 2 * 1024**3))
+
+HASH_BLOCK = 1 << 20
+
+
+# Hash of a file's contents, computed once per process for each (size, mtime)
+def file_hash(path):
+    stat = os.stat(path)
+    return _file_hash(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=64)
+def _file_hash(path, size, mtime_ns):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Cache key from everything a result depends on: names, parameters, file hashes
+def cache_key(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+class DiskCache:
+    # Results stored on disk under a key, shared by every process on the host
+    # and kept across restarts. Each entry is a directory holding an Arrow IPC
+    # file (DataFrames) or .npy files (arrays), read memory-mapped so processes
+    # share one copy through the page cache. Entries are written to a temporary
+    # directory and renamed into place, so readers never see a partial entry.
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # DataFrame stored under `key`, computed and stored on a miss
+    def frame(self, key, compute):
+        return self._get(key, compute, _write_frame, _read_frame)
+
+    # Tuple of arrays stored under `key`, computed and stored on a miss; the
+    # arrays come back memory-mapped and read-only
+    def arrays(self, key, compute):
+        return self._get(key, compute, _write_arrays, _read_arrays)
+
+    def _get(self, key, compute, write, read):
+        if not self.directory:
+            return compute()
+        entry = os.path.join(self.directory, key)
+        try:
+            value = read(entry)
+            os.utime(entry)  # mark as recently used
+            return value
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+        value = compute()
+        # A fresh directory per call: threads of one process can miss the same key
+        tmp_entry = tempfile.mkdtemp(dir=self.directory, prefix=key, suffix=".tmp")
+        write(tmp_entry, value)
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another thread or process stored it first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict(keep=key)
+        # Return the stored copy, so hits and misses give the same (mapped) result
+        try:
+            return read(entry)
+        except (FileNotFoundError, NotADirectoryError):
+            return value
+
+    # Remove least recently used entries until the cache fits in max_bytes
+    def evict(self, keep=None):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_dir() and not entry.name.endswith(".tmp"):
+                    try:
+                        size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                        entries.append((entry.stat().st_mtime_ns, size, entry.name))
+                    except FileNotFoundError:
+                        pass  # evicted by another process meanwhile
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            # Rename first, so no reader opens a half-deleted entry
+            doomed = tempfile.mkdtemp(dir=self.directory, prefix=name, suffix=".tmp")
+            try:
+                os.rename(os.path.join(self.directory, name), doomed)
+            except OSError:
+                os.rmdir(doomed)
+                continue
+            shutil.rmtree(doomed, ignore_errors=True)
+            total -= size
+
+
+def _write_frame(entry, df):
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(os.path.join(entry, "table.arrow"), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_frame(entry):
+    return pa.ipc.open_file(pa.memory_map(os.path.join(entry, "table.arrow"))).read_all().to_pandas()
+
+
+def _write_arrays(entry, arrays):
+    with open(os.path.join(entry, "count"), "w") as f:
+        f.write(str(len(arrays)))
+    for i, array in enumerate(arrays):
+        with open(os.path.join(entry, f"{i}.npy"), "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+
+
+def _read_arrays(entry):
+    with open(os.path.join(entry, "count")) as f:
+        count = int(f.read())
+    return tuple(np.load(os.path.join(entry, f"{i}.npy"), mmap_mode="r") for i in range(count))
+
+
+@lru_cache(maxsize=None)
+def default_cache():
+    return DiskCache()
@@ -0,0 +1,139 @@
+import dataclasses
+import os
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pandas as pd
+from codecarbon.output import EmissionsData
+
+DEFAULT_DB = "emissions.db"
+LEGACY_CSV = "emissions.csv"
+
+# One typed column per CodeCarbon field
+COLUMNS = {
+    field.name: "REAL" if field.type in (float, int, "float", "int") else "TEXT"
+    for field in dataclasses.fields(EmissionsData)
+}
+
+# Lookups the app makes: recent runs overall, per project and per experiment
+INDEXES = {
+    "idx_emissions_timestamp": "timestamp",
+    "idx_emissions_project": "project_name, timestamp",
+    "idx_emissions_experiment": "experiment_id, timestamp",
+}
+
+# Refresh planner statistics after this many inserted rows
+COMPACT_EVERY = 10_000
+
+
+# Connection for one unit of work: committed on success, always closed. Shared by
+# every table in the database file, so connection settings stay consistent.
+@contextmanager
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    # WAL only needs a sync at checkpoints to stay consistent
+    conn.execute("PRAGMA synchronous=NORMAL")
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class EmissionsStore:
+    # SQLite-backed emissions log. A connection is opened per operation, so one
+    # store object is safe to share between threads, and any number of processes
+    # can use the same file (WAL lets readers run alongside the writer).
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS emissions ({', '.join(f'{c} {t}' for c, t in COLUMNS.items())})")
+            # Older stores may predate newer CodeCarbon fields
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(emissions)")}
+            for column, column_type in COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE emissions ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_emissions_run ON emissions (run_id)")
+            for name, columns in INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON emissions ({columns})")
+
+    def _connect(self):
+        return connect(self.path)
+
+    # Insert records (dicts of CodeCarbon fields) in one transaction. Re-inserting
+    # a run_id is ignored, so imports and retries are idempotent.
+    def append(self, records):
+        rows = [tuple(record.get(column) for column in COLUMNS) for record in records]
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(f"INSERT OR IGNORE INTO emissions ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+            inserted = conn.total_changes - before
+            conn.execute(
+                "INSERT INTO meta VALUES ('inserted_since_compact', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value", (inserted,),
+            )
+            pending = conn.execute("SELECT value FROM meta WHERE key = 'inserted_since_compact'").fetchone()[0]
+        if pending >= COMPACT_EVERY:
+            self.compact()
+        return inserted
+
+    # Import a CodeCarbon CSV in chunks; columns the store doesn't know are dropped
+    def import_csv(self, csv_path=LEGACY_CSV, chunksize=50_000):
+        inserted = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk = chunk[[c for c in chunk.columns if c in COLUMNS]]
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            inserted += self.append(chunk.to_dict("records"))
+        return inserted
+
+    def query(self, sql, params=()):
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    # Most recent runs, optionally for one project (served by the project index)
+    def last_runs(self, n=10, project_name=None):
+        if project_name is None:
+            return self.query("SELECT * FROM emissions ORDER BY timestamp DESC LIMIT ?", (n,))
+        return self.query(
+            "SELECT * FROM emissions WHERE project_name = ? ORDER BY timestamp DESC LIMIT ?", (project_name, n),
+        )
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM emissions").fetchone()[0]
+
+    # Refresh index statistics. The table is append-only, so there are no free
+    # pages for VACUUM to reclaim; rewriting the whole file would only stall the
+    # writer for longer as the store grows.
+    def compact(self):
+        with self._connect() as conn:
+            conn.execute("UPDATE meta SET value = 0 WHERE key = 'inserted_since_compact'")
+            # Sample at most ~1000 rows per index, so this stays cheap at millions of rows
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("ANALYZE")
+
+
+# Open the default store, importing the legacy emissions.csv the first time.
+# The import is recorded in the meta table rather than inferred from the file
+# being new, since other tables (the run log) can create the database first.
+def open_store(path=DEFAULT_DB, legacy_csv=LEGACY_CSV):
+    store = EmissionsStore(path)
+    if os.path.exists(legacy_csv) and not store.query("SELECT 1 FROM meta WHERE key = 'imported_legacy_csv'").size:
+        store.import_csv(legacy_csv)
+        with connect(store.path) as conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported_legacy_csv', 1)")
+    return store
+
+
+# The default store, opened once per process
+@lru_cache(maxsize=None)
+def default_store():
+    return open_store()
+
@@ -0,0 +1,165 @@
+import argparse
+import dataclasses
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from functools import lru_cache
+from multiprocessing.util import Finalize
+
+from codecarbon.output import BaseOutput
+
+from emissions_store import EmissionsStore, default_store
+
+# Seconds between flushes to the store; records arriving in between share a transaction
+FLUSH_INTERVAL = float(os.environ.get("GREENMODEL_FLUSH_INTERVAL", "1.0"))
+MAX_BATCH = 1000
+# Attempts at storing a batch while the database is locked or busy
+MAX_ATTEMPTS = 10
+
+logger = logging.getLogger(__name__)
+
+
+class EmissionsWriter:
+    # The one thread in this process that writes emission records. Sessions only
+    # enqueue; the writer batches whatever arrived within flush_interval (or up to
+    # max_batch records) and stores it in a single transaction, so a batch is
+    # either fully written or not at all.
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._closed = False
+        # Serialises submit's closed check with close's sentinel, so no record can
+        # be queued behind the sentinel (it would never be stored or marked done)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="emissions-writer", daemon=True)
+        self._thread.start()
+        # Runs at interpreter exit and when pool worker processes shut down
+        Finalize(self, self.close, exitpriority=10)
+
+    def submit(self, record):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmissionsWriter is closed")
+            self._queue.put(record)
+
+    # Block until every record submitted so far is in the store
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        # Retry while the database is locked or busy (re-inserting a run_id is
+        # ignored, so a retry is safe). Any other error won't go away by
+        # retrying, and would leave flush() waiting forever: drop the batch.
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                self.store.append(batch)
+                break
+            except sqlite3.OperationalError:
+                if attempt == MAX_ATTEMPTS:
+                    logger.exception("Dropped %d emission records after %d attempts", len(batch), attempt)
+                else:
+                    time.sleep(self.flush_interval)
+            except Exception:
+                logger.exception("Dropped %d emission records", len(batch))
+                break
+        for _ in batch:
+            self._queue.task_done()
+
+
+# The writer for the default store, one per process
+@lru_cache(maxsize=None)
+def default_writer():
+    return EmissionsWriter(default_store())
+
+
+# CodeCarbon output handler queueing each run's total for the process writer
+class WriterOutput(BaseOutput):
+    def __init__(self, writer=None):
+        self._writer = writer
+
+    def out(self, total, delta):
+        (self._writer or default_writer()).submit(dataclasses.asdict(total))
+
+
+# Stress check: n_sessions threads each submit records_per_session records
+# through one writer into a fresh store, then every record must be there
+def stress_test(n_sessions=50, records_per_session=200, flush_interval=0.1):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmissionsStore(os.path.join(tmp, "stress.db"))
+        writer = EmissionsWriter(store, flush_interval=flush_interval)
+
+        def session(session_id):
+            for i in range(records_per_session):
+                writer.submit({
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "project_name": f"session-{session_id}",
+                    "run_id": str(uuid.uuid4()),
+                    "experiment_id": "stress-test",
+                    "emissions": i * 1e-9,
+                })
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(s,)) for s in range(n_sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+        elapsed = time.perf_counter() - started
+
+        expected = n_sessions * records_per_session
+        stored = store.count()
+        per_session = store.query("SELECT project_name, COUNT(*) AS n FROM emissions GROUP BY project_name")
+        return {
+            "expected": expected,
+            "stored": stored,
+            "lost": expected - stored,
+            "sessions_complete": bool((per_session["n"] == records_per_session).all()) and len(per_session) == n_sessions,
+            "records_per_sec": expected / elapsed,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress-test concurrent emissions writes.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--flush-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    result = stress_test(args.sessions, args.records, args.flush_interval)
+    print(result)
+    raise SystemExit(0 if result["lost"] == 0 and result["sessions_complete"] else 1)
@@ -0,0 +1,158 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Job states, in the order a job moves through them
+HELD = "held"
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+# A finished job forgotten by the queue (see RETENTION_S)
+EXPIRED = "expired"
+
+# Seconds a finished job's record is kept before the queue drops it
+RETENTION_S = 3600
+
+
+class JobQueue:
+    # Runs callables on a thread or process pool and keeps a record per job ID,
+    # so a Streamlit script can submit work and poll for it on later reruns.
+    # With a sampler_factory (thread pools only), a fresh sampler is started when
+    # each job begins running and stopped when it ends; see power().
+    # Jobs submitted with a future release_at (epoch seconds) are held until then.
+    # pop_result() hands a finished job's result over and keeps only its status;
+    # records of jobs finished more than retention_s ago are dropped, so results
+    # nobody collected don't stay alive for the life of the server.
+
+    def __init__(self, max_workers=2, use_processes=False, sampler_factory=None, retention_s=RETENTION_S):
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=max_workers)
+        self._sampler_factory = None if use_processes else sampler_factory
+        self.retention_s = retention_s
+        self._jobs = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label=None, release_at=None, **kwargs):
+        job_id = uuid.uuid4().hex[:8]
+        now = time.time()
+        record = {
+            "id": job_id, "label": label, "submitted": now, "release_at": release_at or now,
+            "finished": None, "sampler": None, "future": None,
+        }
+
+        if self._sampler_factory is not None:
+            fn = self._sampled(fn, record)
+
+        def _mark_finished(_):
+            record["finished"] = time.time()
+
+        def _release():
+            with self._lock:
+                self._timers.pop(job_id, None)
+                record["future"] = self._executor.submit(fn, *args, **kwargs)
+            record["future"].add_done_callback(_mark_finished)
+
+        self._prune(now)
+        with self._lock:
+            self._jobs[job_id] = record
+        if record["release_at"] > now:
+            timer = threading.Timer(record["release_at"] - now, _release)
+            timer.daemon = True
+            with self._lock:
+                self._timers[job_id] = timer
+            timer.start()
+        else:
+            _release()
+        return job_id
+
+    # Wrap fn so the job's sampler covers exactly the time it runs
+    def _sampled(self, fn, record):
+        def run(*args, **kwargs):
+            record["sampler"] = self._sampler_factory().start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record["sampler"].stop()
+        return run
+
+    # Drop records of jobs that finished more than retention_s ago
+    def _prune(self, now):
+        with self._lock:
+            expired = [
+                job_id for job_id, record in self._jobs.items()
+                if record["finished"] is not None and now - record["finished"] > self.retention_s
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def status(self, job_id):
+        record = self._jobs.get(job_id)
+        if record is None:
+            return EXPIRED
+        if "state" in record:
+            return record["state"]
+        future = record["future"]
+        if future is None:
+            return HELD
+        if not future.done():
+            return RUNNING if future.running() else QUEUED
+        return FAILED if future.exception() is not None else FINISHED
+
+    def is_active(self, job_id):
+        return self.status(job_id) in (HELD, QUEUED, RUNNING)
+
+    def result(self, job_id):
+        # Only call once the job is finished; re-raises the job's exception if it failed
+        return self._jobs[job_id]["future"].result()
+
+    def error(self, job_id):
+        record = self._jobs[job_id]
+        return record["error"] if "state" in record else record["future"].exception()
+
+    # Result of a finished job (None if it failed; see error()). The queue then
+    # keeps only the job's status, releasing its result and power samples.
+    def pop_result(self, job_id):
+        with self._lock:
+            record = self._jobs[job_id]
+            if "state" in record:
+                raise KeyError(f"Result of job {job_id} was already taken")
+            future = record["future"]
+            error = future.exception()
+            record["state"] = FAILED if error is not None else FINISHED
+            record["error"] = error.with_traceback(None) if error is not None else None
+            record["future"] = record["sampler"] = None
+        return future.result() if error is None else None
+
+    # Samples of the job's sampler so far, or None if it hasn't started running
+    def power(self, job_id):
+        record = self._jobs.get(job_id)
+        sampler = record["sampler"] if record is not None else None
+        return sampler.samples() if sampler is not None else None
+
+    def jobs(self, job_ids=None):
+        # Snapshot of the requested jobs (all jobs by default) without their futures
+        with self._lock:
+            records = [self._jobs[j] for j in (job_ids if job_ids is not None else self._jobs) if j in self._jobs]
+
+        snapshot = []
+        for record in records:
+            end = record["finished"] or time.time()
+            snapshot.append({
+                "Job": record["id"],
+                "Label": record["label"],
+                "Status": self.status(record["id"]),
+                "Starts": time.strftime("%H:%M:%S", time.localtime(record["release_at"])),
+                "Elapsed (s)": end - record["submitted"],
+            })
+        return snapshot
+
+    def shutdown(self, wait=True):
+        # Held jobs that haven't been released are dropped
+        with self._lock:
+            timers = list(self._timers.values())
+        for timer in timers:
+            timer.cancel()
+        self._executor.shutdown(wait=wait)
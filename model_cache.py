@@ -0,0 +1,75 @@
+import pickle
+import threading
+from collections import OrderedDict
+
+
+# Cache key for one training config; params are sorted so dict order doesn't matter.
+# n_jobs doesn't change the fitted model but does change the run's time and
+# emissions, which are cached with it.
+def make_key(dataset_name, model_type, params, seed, n_jobs=None):
+    return (dataset_name, model_type, tuple(sorted(params.items())), seed, n_jobs)
+
+
+class ModelCache:
+    # Fitted estimators plus their accuracy/emissions results, evicted least recently
+    # used first once either the entry count or the estimated size is exceeded.
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, model, result):
+        # Pickled size is a close, cheap estimate of an estimator's memory footprint
+        size = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)["size"]
+            self._entries[key] = {"key": key, "model": model, "result": result, "size": size}
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+
+    def find_base(self, dataset_name, model_type, params, seed):
+        # Largest cached model of the same dataset, model and seed that a warm start
+        # can grow into params (every parameter smaller than requested), whatever
+        # core count it was trained with
+        best_key, best_entry = None, None
+        with self._lock:
+            for key, entry in self._entries.items():
+                cached_dataset, cached_model, cached_params, cached_seed, _ = key
+                cached_params = dict(cached_params)
+                if (cached_dataset, cached_model, cached_seed) != (dataset_name, model_type, seed):
+                    continue
+                if cached_params.keys() != params.keys() or any(cached_params[k] >= params[k] for k in params):
+                    continue
+                if best_key is None or sum(cached_params.values()) > sum(dict(best_key[2]).values()):
+                    best_key, best_entry = key, entry
+            if best_key is not None:
+                self._entries.move_to_end(best_key)
+        return best_entry
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
@@ -1,8 +1,15 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import random
 from theme import apply_theme
+from co2_data import METRICS, SeriesIndex, data_version, load_metrics
+from downsample import lttb
+
+# Points sent to the browser by the comparison chart, however many countries are
+# shown; each series gets an equal share, but never fewer than MIN_SERIES_POINTS
+MAX_POINTS = 20_000
+MIN_SERIES_POINTS = 20
 
 st.set_page_config(page_title="Global CO₂ Emissions", layout="centered")
 
@@ -15,8 +22,9 @@ with st.expander("📖 Global CO₂ Emissions Dashboard User Guide and Data Sour
     **ℹ️ User Guide**
 
     **1. How to Use**
-    - **Select a country** to see its emissions trend.
+    - **Select a country and a metric** to see its trend: total, per-capita, per-GDP, cumulative, year-over-year growth or rank among all countries.
     - **View the Top 10 Emitters** for the latest year.
+    - **Compare countries** over their full history (back to 1750), from a few up to all of them, by any of the same metrics.
 
     **2. Data Source**
                 
@@ -29,27 +37,35 @@ with st.expander("📖 Global CO₂ Emissions Dashboard User Guide and Data Sour
      **📝 Notes:** Some countries might have limited data. Knowledge leads to action.
     """)
     
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/countries_co2_data.csv")
-    df = df[df["year"] >= 2000]
-    df = df[~df["country"].isin(["World", "Asia", "Europe", "Africa", "North America", "South America", "European Union", "Oceania"])]
-    return df
+# Compact Parquet copy of the OWID data (built from the CSV on first use), with
+# the derived metrics of every country and year (cumulative totals need the full
+# history) read from the shared disk cache and indexed once per data version
+@st.cache_resource
+def load_index(version):
+    return SeriesIndex(load_metrics())
 
-df = load_data()
+index = load_index(data_version())
+metrics = {label: column for label, column in METRICS.items() if column in index.df.columns}
 
-countries = df["country"].unique()
-selected_country = st.selectbox("Select a country:", sorted(countries), index=None, placeholder="Select the country .." )
+selected_country = st.selectbox("Select a country:", index.countries, index=None, placeholder="Select the country .." )
+selected_label = st.selectbox("Metric:", list(metrics))
+selected_metric = metrics[selected_label]
 
-country_data = df[df["country"] == selected_country]
+country_history = index.series(selected_country)
+country_data = country_history[country_history["year"] >= 2000]
 
 st.subheader(f"CO₂ Emissions Over Time for {selected_country}")
-fig = px.line(country_data, x="year", y="co2", labels={"co2": "CO₂ (million tonnes)"}, title=f"{selected_country} - CO₂ Emissions (2000-2022)")
+fig = px.line(country_data, x="year", y=selected_metric, labels={selected_metric: selected_label}, title=f"{selected_country} - {selected_label} (2000-2022)")
+if selected_metric == "co2_rank":
+    fig.update_yaxes(autorange="reversed")
 st.plotly_chart(fig, use_container_width=True)
 
 if not country_data.empty:
     total_emissions = country_data["co2"].sum()
-    st.info(f"🌟 Since 2000, {selected_country} emitted approximately **{total_emissions:,.0f} million tonnes** of CO₂.")
+    st.info(
+        f"🌟 Since 2000, {selected_country} emitted approximately **{total_emissions:,.0f} million tonnes** of CO₂ "
+        f"(**{country_history['cumulative_co2'].iloc[-1]:,.0f} million tonnes** since records began)."
+    )
     st.markdown("""
     **Fun Fact:**  
     - 1 million tonnes of CO₂ is roughly equal to the emissions from **217,000 cars** running for an entire year 🚗.
@@ -57,9 +73,40 @@ if not country_data.empty:
     ---
     """)
 
+st.subheader("📈 Compare Countries")
+if st.toggle("Compare countries over their full history"):
+    metric_label = st.selectbox("Metric", list(metrics))
+    metric = metrics[metric_label]
+    if st.checkbox("All countries"):
+        compared = index.countries
+    else:
+        compared = st.multiselect("Countries", index.countries, default=list(index.top(index.latest_year)["country"]))
+    first_year, last_year = int(index.df["year"].min()), index.latest_year
+    start_year, end_year = st.slider("Years", first_year, last_year, (first_year, last_year))
+
+    # WebGL traces, each downsampled on the server (LTTB keeps peaks and dips)
+    # so the chart payload stays bounded
+    series_points = max(MIN_SERIES_POINTS, MAX_POINTS // max(len(compared), 1))
+    fig_compare = go.Figure()
+    plotted = 0
+    for country in compared:
+        series = index.series(country)
+        series = series[series["year"].between(start_year, end_year) & series[metric].notna()]
+        x, y = lttb(series["year"], series[metric], series_points)
+        plotted += len(x)
+        fig_compare.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=country))
+    fig_compare.update_layout(
+        title=f"{metric_label} ({start_year}-{end_year})", xaxis_title="Year", yaxis_title=metric_label,
+        showlegend=len(compared) <= 20,
+    )
+    if metric == "co2_rank":
+        fig_compare.update_yaxes(autorange="reversed")
+    st.plotly_chart(fig_compare, use_container_width=True)
+    st.caption(f"{len(compared)} countries, {plotted:,} points plotted (at most {series_points} per country).")
+
 st.subheader("🌎 Top 10 Countries by CO₂ Emissions (Latest Year)")
-latest_year = df["year"].max()
-top10 = df[df["year"] == latest_year].sort_values(by="co2", ascending=False).head(10)
+latest_year = index.latest_year
+top10 = index.top(latest_year)
 fig2 = px.bar(top10, x="country", y="co2", labels={"co2": "CO₂ (million tonnes)"}, title=f"Top 10 Emitters in {latest_year}")
 st.plotly_chart(fig2, use_container_width=True)
 
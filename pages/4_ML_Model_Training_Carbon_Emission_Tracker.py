@@ -1,16 +1,28 @@
-
 import streamlit as st
-from codecarbon import EmissionsTracker
-from sklearn.datasets import load_iris, load_wine, load_breast_cancer
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score
 import pandas as pd
-import time
 import plotly.express as px
 import random
+import os
+import uuid
 from theme import apply_theme
+from training import (
+    DATASETS, MODELS, DEFAULT_SEED, SYNTHETIC_PREFIX, SYNTHETIC_ROWS,
+    train_model, train_within_budget, format_params, synthetic_name,
+)
+from model_cache import ModelCache, make_key
+from sweep import build_grid, run_sweep
+from scaling import DEFAULT_CORES, scaling_report
+from benchmark import DEFAULT_BATCH_SIZES, inference_report
+from cross_validation import cross_validate, compare_cv_strategies
+from jobs import JobQueue, EXPIRED, FAILED, RUNNING
+from power_sampler import PowerSampler
+from carbon_scheduler import FORECAST_PATH, load_forecast, release_time, simulate_backlog
+from projection import project_emissions
+from tracker_service import default_service
+from emissions_store import default_store
+from emissions_writer import FLUSH_INTERVAL
+from run_log import RunLog
+from calibration import CONFIDENCE, DEFAULT_RUNS, calibrate, net_emissions
 
 # Streamlit config
 st.set_page_config(page_title="GreenModel: Carbon Tracker", layout="centered")
@@ -22,10 +34,20 @@ st.title("🌱 ML Model Training Carbon Emission Tracker")
 with st.expander("📖 ML Model Training Carbon Emission Tracker User Guide"):
     st.markdown("""
     **ℹ️ User Guide**
+
+    **0. Choose a Mode**
+
+    - `Single Run`: Train one configuration per click.
+    - `Hyperparameter Sweep`: Train a whole grid of configurations in parallel and find the Pareto-optimal ones.
+    - `Scaling Report`: Train Random Forests on synthetic datasets of growing size with more and more CPU cores, and see where parallelism saves time and energy.
+    - `Inference Benchmark`: Measure predictions per second and CO₂ per 1,000 predictions at different batch sizes, and how the number of trees changes the cost of each prediction.
+    - `Cross-Validation`: Score a configuration on k folds run in parallel, with the accuracy spread and the CO₂ of every fold, and optionally compare against running the folds one by one.
+    - `Calibration`: Measure the CO₂ the tracker itself reports for an empty run on this machine. Once calibrated, results also show **net emissions** (the run minus the tracker's overhead) with confidence bounds, so tiny runs aren't mistaken for real costs.
                 
     **1. Choose a Dataset**
                 
     Select from `Iris`, `Wine`, or `Breast Cancer` datasets. These are classic machine learning datasets used for classification tasks.
+    Or pick `Synthetic` and choose its size (10,000 up to millions of rows) and number of features.
 
     **2. Choose a Model**
                 
@@ -38,73 +60,216 @@ with st.expander("📖 ML Model Training Carbon Emission Tracker User Guide"):
     Adjust:
     - `Number of Trees` for Random Forest  
     - `Max Iterations` for Logistic Regression  
+    - `CPU cores` used to grow the Random Forest's trees in parallel  
 
     **4. Train & Track**
                 
     Click **Train Model & Track Emissions** to:
-    - Train the selected model on the dataset
+    - Queue a training job for the selected model and dataset (you can keep adjusting settings while it runs)
     - Measure CO₂ emissions using CodeCarbon
     - See the model’s accuracy and emissions (in grams)
 
+    Training the exact same configuration again returns the cached result instantly, and the emissions you avoided are added up for you.
+    With **Incremental mode** on, raising the trees or iterations grows your previous model instead of starting over, so only the extra work is trained and tracked.
+    With **Carbon-aware start** on, upload a carbon-intensity forecast (see `carbon_forecast.example.csv` for the format): your job waits until the grid is below your threshold (or until your deadline) before it starts, and you can simulate how much CO₂ that saves for a whole backlog of jobs.
+    With **Carbon budget mode** on, the model is grown 10 trees or epochs at a time and training stops as soon as the measured emissions reach your budget; you get the most accurate model reached within it.
+
     **📈 Additional Insights**
 
-    - **Previous Runs Table**: Shows accuracy & CO₂ for all your training runs.
+    - **Training Jobs**: Shows whether each submitted job is held for a greener grid, queued, running, finished or failed, with a live chart of the power drawn and energy used while it runs.
+    - **Per-Phase Breakdown**: Splits each run's time, energy and CO₂ between data loading, fitting, predicting and evaluating.
+    - **Sweep Results**: Plots accuracy against CO₂ for every swept configuration and lists the Pareto-optimal ones (no other configuration is both more accurate and greener).
+    - **Tracker Overhead Calibration**: The CO₂ of each empty calibration run, and the average overhead subtracted from your results.
+    - **Previous Runs Table**: Shows accuracy & CO₂ for all your training runs. Runs are saved, so they are still there after you reload the page; enter the same **Run log** name in the sidebar as your teammates to share one history.
     - **Emissions Chart**: Visualizes emissions from each run.
     - **Greenest Configuration**: Highlights the most eco-friendly model setup for each dataset.
     - **Real-world Equivalents**: Understand your emissions in terms of real-life activities (e.g., candles burned, meters driven).
+    - **Where Should It Run?**: A world map of what your latest run would have emitted on each country's electricity grid, using the energy it actually used.
+    - **Recent Tracked Runs**: The latest runs recorded in the shared emissions store by every user of the app.
 
     ---
 
     💡 **Tip:** Try different models and parameters to see which is the most energy-efficient!
     """)
     
-# Session state logs
-if "logs" not in st.session_state:
-    st.session_state.logs = []
+# Durable run log, shared by every session
+@st.cache_resource
+def get_run_log():
+    return RunLog()
+
+run_log = get_run_log()
+
+# The log name lives in the URL so a reload or reconnect reopens the same log
+if "log" not in st.query_params:
+    st.query_params["log"] = uuid.uuid4().hex[:8]
+log_name = st.sidebar.text_input("📒 Run log (use the same name as your team to share runs)", st.query_params["log"]).strip() or st.query_params["log"]
+st.query_params["log"] = log_name
+
+# This session's copy of the log, read in full once and then only new rows
+def refresh_logs():
+    if st.session_state.get("log_name") != log_name:
+        st.session_state.log_name = log_name
+        st.session_state.logs = run_log.read(log_name)
+        return
+    logs = st.session_state.logs
+    new_rows = run_log.read(log_name, after_id=logs.index.max() if len(logs) else 0)
+    if not new_rows.empty:
+        st.session_state.logs = pd.concat([logs, new_rows])
+
+refresh_logs()
+
+# Training jobs submitted from this session, in submission order
+if "jobs" not in st.session_state:
+    st.session_state.jobs = {}
+
+# Per-phase measurements of this session's single runs, one row per (run, phase)
+if "phase_logs" not in st.session_state:
+    st.session_state.phase_logs = []
+
+# Grams of CO₂ not emitted thanks to cache hits in this session
+if "emissions_avoided" not in st.session_state:
+    st.session_state.emissions_avoided = 0.0
+
+# Parsed carbon-intensity forecast, cached per file content
+@st.cache_data
+def read_forecast(data, name):
+    return load_forecast(data, name)
+
+st.markdown("### ⚙️ Choose a mode")
+mode = st.radio(
+    "Mode", ["Single Run", "Hyperparameter Sweep", "Scaling Report", "Inference Benchmark", "Cross-Validation", "Calibration"],
+    horizontal=True,
+)
+
+max_cores = os.cpu_count() or 1
+
+if mode in ("Single Run", "Inference Benchmark", "Cross-Validation"):
+    st.markdown("### 📊 Choose a dataset")
+    dataset_name = st.radio("Dataset", list(DATASETS) + [SYNTHETIC_PREFIX])
+    if dataset_name == SYNTHETIC_PREFIX:
+        n_rows = st.select_slider("📏 Rows", SYNTHETIC_ROWS, value=SYNTHETIC_ROWS[0], format_func=lambda n: f"{n:,}")
+        n_features = st.slider("🧩 Features", 2, 100, 20)
+        dataset_name = synthetic_name(n_rows, n_features)
+
+    st.markdown("### 🧠 Choose a model")
+    model_type = st.radio("Model", MODELS)
+
+    # Parameters input
+    if model_type == "Random Forest":
+        params = {"n_estimators": st.slider("🌲 Number of Trees", 10, 200, 100, 10)}
+        n_jobs = st.number_input("🧵 CPU cores (n_jobs)", min_value=1, max_value=max_cores, value=1)
+    else:
+        params = {"max_iter": st.slider("🔁 Max Iterations (Epochs)", 10, 200, 100, 10)}
+        n_jobs = None
+
+    if mode == "Single Run":
+        budget_mode = st.toggle("🎯 Carbon budget mode (stop training when the budget is spent)")
+        if budget_mode:
+            budget_g = st.number_input("Budget (g CO₂eq)", min_value=0.0, value=0.00001, step=0.000001, format="%.6f")
+            incremental = False
+        else:
+            incremental = st.toggle("♻️ Incremental mode (warm start from a smaller cached model)", value=True)
+
+        # Carbon-aware start: hold the job until the forecast grid intensity is low enough
+        release_at = None
+        if st.toggle("🕒 Carbon-aware start (wait for a greener grid)"):
+            forecast_file = st.file_uploader("Carbon-intensity forecast (CSV or JSON with timestamp, intensity in g CO₂eq/kWh)", type=["csv", "json"])
+            forecast = None
+            try:
+                if forecast_file is not None:
+                    forecast = read_forecast(forecast_file.getvalue(), forecast_file.name)
+                elif os.path.exists(FORECAST_PATH):
+                    with open(FORECAST_PATH, "rb") as f:
+                        forecast = read_forecast(f.read(), FORECAST_PATH)
+            except ValueError as e:
+                st.error(f"❌ Could not read the forecast: {e}")
+
+            if forecast is None:
+                st.info(f"Upload a forecast, or place one at `{FORECAST_PATH}`, to schedule training.")
+            else:
+                threshold = st.number_input("Start when intensity is at most (g CO₂eq/kWh)", min_value=0.0, value=float(forecast["intensity"].median()), step=10.0)
+                deadline_h = st.slider("⏰ Start at the latest after (hours)", 1, 48, 12)
+                now = pd.Timestamp.now(tz="UTC")
+                release_at = release_time(forecast, now, threshold, now + pd.Timedelta(hours=deadline_h))
+                if forecast["timestamp"].iloc[-1] < now:
+                    st.warning(f"⚠️ The forecast ends at {forecast['timestamp'].iloc[-1]:%Y-%m-%d %H:%M} UTC; without newer data, jobs wait until the deadline.")
+                if release_at <= now:
+                    st.caption("🟢 The grid is already below your threshold: training starts right away.")
+                else:
+                    st.caption(f"🕒 Training will start at **{release_at:%Y-%m-%d %H:%M} UTC**.")
+
+                with st.expander("🧮 Simulate a job backlog"):
+                    sim_jobs = st.slider("Jobs (one submitted per hour from the start of the forecast)", 1, 100, 24)
+                    default_energy = st.session_state.get("last_result", {}).get("energy_kwh", 0.001)
+                    sim_energy = st.number_input("Energy per job (kWh)", min_value=0.0, value=float(default_energy), format="%.6f")
+                    df_sim = simulate_backlog(forecast, sim_jobs, sim_energy, threshold, pd.Timedelta(hours=deadline_h))
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Run Immediately", f"{df_sim['Immediate (g CO₂eq)'].sum():.4f} g CO₂eq")
+                    col2.metric("Carbon-Aware", f"{df_sim['Scheduled (g CO₂eq)'].sum():.4f} g CO₂eq")
+                    col3.metric("Saved", f"{df_sim['Saved (g CO₂eq)'].sum():.4f} g CO₂eq")
+                    st.caption(f"Average delay: {df_sim['Delay (h)'].mean():.1f} h")
+                    fig_forecast = px.line(forecast, x="timestamp", y="intensity", title="Forecast Carbon Intensity (g CO₂eq/kWh)")
+                    fig_forecast.add_hline(y=threshold, line_dash="dash", annotation_text="Threshold")
+                    st.plotly_chart(fig_forecast)
+                    st.dataframe(df_sim, hide_index=True)
+    elif mode == "Inference Benchmark":
+        st.markdown("### 📦 Choose inference batches")
+        batch_sizes = st.multiselect("Batch sizes", [1, 8, 32, 128, 256, 1024, 4096], default=DEFAULT_BATCH_SIZES)
+        replicate = st.slider("🔂 Replicate test data (×)", 1, 100, 10)
+    else:
+        st.markdown("### 🔀 Choose folds")
+        cv_folds = st.slider("Folds (k)", 3, 10, 5)
+        cv_workers = st.number_input("⚡ Parallel workers", min_value=1, max_value=max_cores, value=max_cores)
+        cv_compare = st.toggle("⚖️ Also run the folds sequentially to compare emissions", value=True)
+    selected_datasets = [dataset_name]
+elif mode == "Hyperparameter Sweep":
+    st.markdown("### 📊 Choose datasets")
+    selected_datasets = st.multiselect("Datasets", list(DATASETS), default=list(DATASETS))
+
+    st.markdown("### 🧠 Choose models")
+    sweep_models = st.multiselect("Models", MODELS, default=MODELS)
+
+    # Sweep grid: the same value range is used for trees and max iterations
+    low, high = st.slider("🌲🔁 Trees / Max Iterations range", 10, 200, (10, 200), 10)
+    step = st.select_slider("Step", [10, 20, 50, 100], value=10)
+    max_workers = st.number_input("⚡ Parallel workers", min_value=1, max_value=max_cores, value=max_cores)
+    sweep_configs = build_grid(selected_datasets, sweep_models, range(low, high + 1, step))
+    incremental = st.toggle("♻️ Warm-start chains (grow each model instead of retraining per value)", value=True)
+    st.caption(f"{len(sweep_configs)} configurations will be trained, each with its own emissions measurement.")
+elif mode == "Calibration":
+    st.markdown("### 🎛️ Calibrate the tracker")
+    calibration_runs = st.slider("Empty runs to measure", 3, 30, DEFAULT_RUNS)
+    st.caption("Each empty run starts and stops the tracker exactly like a training run, with nothing to train in between.")
+    selected_datasets = []
+else:
+    st.markdown("### 📏 Choose dataset sizes")
+    scaling_rows = st.multiselect("Rows", SYNTHETIC_ROWS, default=SYNTHETIC_ROWS[:2], format_func=lambda n: f"{n:,}")
+    scaling_features = st.slider("🧩 Features", 2, 100, 20)
+    scaling_cores = st.multiselect("🧵 CPU cores to compare", list(range(1, max_cores + 1)), default=[c for c in DEFAULT_CORES if c <= max_cores])
+    scaling_trees = st.slider("🌲 Number of Trees", 10, 200, 100, 10)
+    st.caption(f"{len(scaling_rows) * len(scaling_cores)} Random Forest runs will be trained one after another.")
+    selected_datasets = []
 
-st.markdown("### 📊 Choose a dataset")
-dataset_name = st.radio("Dataset", ["Iris", "Wine", "Breast Cancer"])
+# One job queue per server process, shared by every session
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=2, sampler_factory=PowerSampler)
 
-st.markdown("### 🧠 Choose a model")
-model_type = st.radio("Model", ["Random Forest", "Logistic Regression"])
+jobs = get_job_queue()
 
-# Parameters input
-if model_type == "Random Forest":
-    n_estimators = st.slider("🌲 Number of Trees", 10, 200, 100, 10)
-else:
-    max_iter = st.slider("🔁 Max Iterations (Epochs)", 10, 200, 100, 10)
-
-# Load dataset
-def load_data(name):
-    if name == "Iris":
-        data = load_iris()
-    elif name == "Wine":
-        data = load_wine()
-    elif name == "Breast Cancer":
-        data = load_breast_cancer()
-    return data.data, data.target
-
-X, y = load_data(dataset_name)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Train function
-def train_model():
-    tracker = EmissionsTracker(output_dir=".", output_file="emissions.csv", measure_power_secs=1, log_level="error")
-    tracker.start()
-
-    with st.spinner("🚀 Training in progress..."):
-        time.sleep(1)
-        if model_type == "Random Forest":
-            model = RandomForestClassifier(n_estimators=n_estimators)
-        else:
-            model = LogisticRegression(max_iter=max_iter)
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        acc = accuracy_score(y_test, preds)
+# Fitted models and results, shared by every session and evicted LRU-first
+@st.cache_resource
+def get_model_cache():
+    return ModelCache()
+
+model_cache = get_model_cache()
+
+# Tracker overhead measured on this host, shared by every session
+@st.cache_resource
+def get_calibration():
+    return {}
 
-    emissions_kg = tracker.stop()
-    emissions_g = emissions_kg * 1000
-    return acc, emissions_g
+calibration = get_calibration()
 
 # Function to convert emissions to real-world equivalents
 def co2_to_real_world_equivalent(co2_emission_grams):
@@ -130,55 +295,424 @@ def co2_to_real_world_equivalent(co2_emission_grams):
         
     return equivalents_in_words
 
-# Train button
-if st.button("🎯 Train Model & Track Emissions"):
-    accuracy, emissions_g = train_model()
-    st.success(f"✅ Accuracy: **{accuracy*100:.2f}%**, Emissions: **{emissions_g:.4f} g CO₂eq**")
+# Train button: queue the run instead of blocking this script
+train_clicked = mode == "Single Run" and st.button("🎯 Train Model & Track Emissions")
+if train_clicked and budget_mode:
+    job_id = jobs.submit(
+        train_within_budget, dataset_name, model_type, params, budget_g, n_jobs=n_jobs,
+        label=f"{dataset_name} / {model_type} / up to {format_params(model_type, params)} / budget {budget_g:.6f} g",
+        release_at=release_at.timestamp() if release_at is not None else None,
+    )
+    st.session_state.jobs[job_id] = {
+        "kind": "budget",
+        "Dataset": dataset_name,
+        "Model": model_type,
+        "Params": f"up to {format_params(model_type, params)}",
+        "budget_g": budget_g,
+        "logged": False,
+    }
+elif train_clicked:
+    cache_key = make_key(dataset_name, model_type, params, DEFAULT_SEED, n_jobs)
+    cached = model_cache.get(cache_key)
+    if cached is not None:
+        # Same config and seed already trained: reuse it instead of burning CO₂ again
+        st.session_state.emissions_avoided += cached["result"]["emissions_g"]
+        st.session_state.last_result = {**cached["result"], "cached": True}
+    else:
+        base = model_cache.find_base(dataset_name, model_type, params, DEFAULT_SEED) if incremental else None
+        run_params = format_params(model_type, params)
+        if base is not None:
+            run_params += f" (warm start from {format_params(model_type, dict(base['key'][2]))})"
+        job_id = jobs.submit(
+            train_model, dataset_name, model_type, params, DEFAULT_SEED, base["model"] if base else None, n_jobs=n_jobs,
+            label=f"{dataset_name} / {model_type} / {run_params}",
+            release_at=release_at.timestamp() if release_at is not None else None,
+        )
+        st.session_state.jobs[job_id] = {
+            "kind": "single",
+            "Dataset": dataset_name,
+            "Model": model_type,
+            "Params": run_params,
+            "cache_key": cache_key,
+            # Cost of the base model, so the cached entry records the full config's cost
+            "base_emissions_g": base["result"]["emissions_g"] if base else 0.0,
+            "logged": False,
+        }
+
+# Sweep button: the whole grid runs as one job on a process pool
+if mode == "Hyperparameter Sweep" and st.button("🧪 Run Sweep & Track Emissions", disabled=not sweep_configs):
+    job_id = jobs.submit(
+        run_sweep, sweep_configs, max_workers, incremental,
+        label=f"Sweep / {len(sweep_configs)} configs",
+    )
+    st.session_state.jobs[job_id] = {
+        "kind": "sweep",
+        "Dataset": ", ".join(selected_datasets),
+        "Model": ", ".join(sweep_models),
+        "Params": f"{len(sweep_configs)} configs",
+        "logged": False,
+    }
+
+# Scaling button: runs are sequential inside the job so they don't share cores
+if mode == "Scaling Report" and st.button("📏 Run Scaling Report", disabled=not (scaling_rows and scaling_cores)):
+    job_id = jobs.submit(
+        scaling_report, scaling_rows, scaling_cores, scaling_features, scaling_trees,
+        label=f"Scaling / {len(scaling_rows)} sizes × {len(scaling_cores)} core counts",
+    )
+    st.session_state.jobs[job_id] = {
+        "kind": "scaling",
+        "Dataset": f"{SYNTHETIC_PREFIX} ({scaling_features} features)",
+        "Model": "Random Forest",
+        "Params": f"Trees: {scaling_trees}",
+        "logged": False,
+    }
+
+# Benchmark button: train once, then measure only inference
+if mode == "Inference Benchmark" and st.button("📦 Run Inference Benchmark", disabled=not batch_sizes):
+    job_id = jobs.submit(
+        inference_report, dataset_name, model_type, params, sorted(batch_sizes), replicate, n_jobs=n_jobs,
+        label=f"Inference / {dataset_name} / {model_type} / {format_params(model_type, params)}",
+    )
+    st.session_state.jobs[job_id] = {
+        "kind": "inference",
+        "Dataset": dataset_name,
+        "Model": model_type,
+        "Params": format_params(model_type, params),
+        "logged": False,
+    }
 
-    st.session_state.logs.append({
+# Cross-validation button: folds run in worker processes inside the job
+if mode == "Cross-Validation" and st.button("🔀 Run Cross-Validation & Track Emissions"):
+    cv_fn = compare_cv_strategies if cv_compare else cross_validate
+    job_id = jobs.submit(
+        cv_fn, dataset_name, model_type, params, cv_folds, cv_workers,
+        label=f"CV / {dataset_name} / {model_type} / {format_params(model_type, params)} / k={cv_folds}",
+    )
+    st.session_state.jobs[job_id] = {
+        "kind": "cv",
         "Dataset": dataset_name,
         "Model": model_type,
-        "Params": f"{'Trees: ' + str(n_estimators) if model_type=='Random Forest' else 'Epochs: ' + str(max_iter)}",
-        "Accuracy (%)": f"{accuracy*100:.4f}",
-        "Emissions (g CO₂eq)": f"{emissions_g:.4f}"
-    })
+        "Params": f"{format_params(model_type, params)} ({cv_folds}-fold CV)",
+        "logged": False,
+    }
+
+# Calibration button: a job of empty tracked runs
+if mode == "Calibration" and st.button("🎛️ Calibrate Tracker Overhead"):
+    job_id = jobs.submit(calibrate, calibration_runs, label=f"Calibration / {calibration_runs} empty runs")
+    st.session_state.jobs[job_id] = {
+        "kind": "calibration",
+        "Dataset": "Empty run",
+        "Model": "Tracker only",
+        "Params": f"{calibration_runs} runs",
+        "logged": False,
+    }
+
+# Move finished jobs into the run log exactly once
+def collect_finished_jobs():
+    collected = False
+    for job_id, job in st.session_state.jobs.items():
+        if job["logged"] or jobs.is_active(job_id):
+            continue
+        job["logged"] = True
+        collected = True
+        if jobs.status(job_id) == EXPIRED:
+            job["error"] = "finished too long ago; its result is no longer available"
+            continue
+        # Take the result out of the shared queue, so it only lives in this session
+        result = jobs.pop_result(job_id)
+        if jobs.status(job_id) == FAILED:
+            job["error"] = str(jobs.error(job_id))
+            continue
+
+        if job["kind"] == "sweep":
+            st.session_state.sweep_results = result
+            run_log.append(log_name, [
+                {
+                    "dataset": row["Dataset"],
+                    "model": row["Model"],
+                    "params": row["Params"],
+                    "accuracy": row["Accuracy (%)"] / 100,
+                    "emissions_g": row["Emissions (g CO₂eq)"],
+                }
+                for row in result.to_dict("records")
+            ])
+            continue
+
+        if job["kind"] == "scaling":
+            st.session_state.scaling_results = result
+            continue
+
+        if job["kind"] == "calibration":
+            calibration["latest"] = result
+            continue
+
+        if job["kind"] == "cv":
+            st.session_state.cv_results = {"label": f"{job['Dataset']} / {job['Model']} / {job['Params']}", **result}
+            run_log.append(log_name, [{
+                "dataset": job["Dataset"],
+                "model": job["Model"],
+                "params": job["Params"],
+                "accuracy": result["mean_accuracy"] / 100,
+                "emissions_g": result["emissions_g"],
+            }])
+            continue
+
+        if job["kind"] == "inference":
+            st.session_state.inference_results = {"label": f"{job['Dataset']} / {job['Model']} / {job['Params']}", **result}
+            continue
+
+        if job["kind"] == "budget":
+            st.session_state.budget_run = {"budget_g": job["budget_g"], "steps": pd.DataFrame(result["steps"])}
+            st.session_state.last_result = {"accuracy": result["accuracy"], "emissions_g": result["emissions_g"]}
+            run_log.append(log_name, [{
+                "dataset": job["Dataset"],
+                "model": job["Model"],
+                "params": f"{format_params(job['Model'], result['best_params'])} (budget {job['budget_g']:.6f} g)",
+                "accuracy": result["accuracy"],
+                "emissions_g": result["emissions_g"],
+            }])
+            continue
+
+        result = dict(result)
+        model = result.pop("model")
+        model_cache.put(job["cache_key"], model, {**result, "emissions_g": job["base_emissions_g"] + result["emissions_g"]})
+        st.session_state.last_result = result
+        [run_id] = run_log.append(log_name, [{
+            "dataset": job["Dataset"],
+            "model": job["Model"],
+            "params": job["Params"],
+            "accuracy": result["accuracy"],
+            "emissions_g": result["emissions_g"],
+        }])
+        run_label = f"#{run_id} {job['Dataset']} / {job['Params']}"
+        for phase in result["phases"]:
+            st.session_state.phase_logs.append({"Run": run_label, **phase})
+    return collected
+
+collect_finished_jobs()
+has_active_jobs = any(jobs.is_active(job_id) for job_id in st.session_state.jobs)
+
+# Job monitor: polls while jobs are queued or running, then refreshes the page once
+@st.fragment(run_every=1 if has_active_jobs else None)
+def job_monitor():
+    if not st.session_state.jobs:
+        return
+    st.subheader("⏳ Training Jobs")
+    st.dataframe(pd.DataFrame(jobs.jobs(list(st.session_state.jobs))), hide_index=True)
+
+    for job in st.session_state.jobs.values():
+        if "error" in job:
+            st.error(f"❌ {job['Dataset']} / {job['Model']} ({job['Params']}) failed: {job['error']}")
+
+    # Live power draw and energy of running jobs, sampled every 100 ms
+    for job_id, job in st.session_state.jobs.items():
+        if jobs.status(job_id) != RUNNING:
+            continue
+        power = jobs.power(job_id)
+        if power is None or len(power) < 2:
+            continue
+        df_power = power.melt("Time (s)", ["Power (W)", "Energy (kWh)"], var_name="Metric", value_name="Value")
+        fig_power = px.line(
+            df_power, x="Time (s)", y="Value", facet_row="Metric",
+            title=f"⚡ Live Power — {job['Dataset']} / {job['Model']} ({job['Params']})",
+        )
+        fig_power.update_yaxes(matches=None, title=None)
+        fig_power.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+        st.plotly_chart(fig_power, key=f"power_{job_id}")
+
+    if collect_finished_jobs():
+        st.rerun()
+
+job_monitor()
+refresh_logs()
+
+if "last_result" in st.session_state:
+    result = st.session_state.last_result
+    if result.get("cached"):
+        st.success(f"♻️ Cached result — Accuracy: **{result['accuracy']*100:.2f}%**, Emissions avoided: **{result['emissions_g']:.4f} g CO₂eq**")
+    else:
+        st.success(f"✅ Accuracy: **{result['accuracy']*100:.2f}%**, Emissions: **{result['emissions_g']:.4f} g CO₂eq**")
+        if "latest" in calibration:
+            net = net_emissions(result["emissions_g"], calibration["latest"])
+            st.caption(
+                f"Net of tracker overhead: **{net['net_g']:.3e} g CO₂eq** "
+                f"({CONFIDENCE:.0%} CI {net['low_g']:.3e} – {net['high_g']:.3e} g); "
+                f"the overhead is {net['overhead_share']:.0%} of the measured emissions."
+            )
+
+if st.session_state.emissions_avoided > 0:
+    st.metric("♻️ Emissions avoided by cache (this session)", f"{st.session_state.emissions_avoided:.4f} g CO₂eq")
+
+# Calibration: what the tracker reports when there is nothing to measure
+if "latest" in calibration:
+    cal = calibration["latest"]
+    st.subheader("🎛️ Tracker Overhead Calibration")
+    st.caption(f"Calibrated {cal['timestamp']} from {cal['n_runs']} empty runs")
+    col1, col2 = st.columns(2)
+    col1.metric("Mean Overhead", f"{cal['mean_g']:.3e} g CO₂eq")
+    col2.metric("Std Overhead", f"± {cal['std_g']:.3e} g CO₂eq")
+    fig_calibration = px.bar(
+        cal["samples"], x="Run", y="Emissions (g CO₂eq)", hover_data=["Duration (s)", "Energy (kWh)"],
+        title="Emissions of Each Empty Tracked Run",
+    )
+    st.plotly_chart(fig_calibration)
+
+# Per-phase breakdown: which phase of training is worth optimizing
+if st.session_state.phase_logs:
+    df_phases = pd.DataFrame(st.session_state.phase_logs)
+    latest_run = df_phases["Run"].iloc[-1]
+    df_latest = df_phases[df_phases["Run"] == latest_run].drop(columns="Run")
+    df_latest["Share of Emissions (%)"] = df_latest["Emissions (g CO₂eq)"] / df_latest["Emissions (g CO₂eq)"].sum() * 100
+
+    st.subheader("🧩 Per-Phase Breakdown")
+    st.caption(f"Latest run: {latest_run}")
+    st.dataframe(df_latest, hide_index=True)
+    fig_phases = px.bar(
+        df_phases, x="Run", y="Emissions (g CO₂eq)", color="Phase", hover_data=["Duration (s)", "Energy (kWh)"],
+        title="Emissions per Phase for Each Run",
+    )
+    st.plotly_chart(fig_phases)
+
+# Carbon budget run: accuracy reached as emissions accumulated, against the budget
+if "budget_run" in st.session_state:
+    budget_run = st.session_state.budget_run
+    df_steps = budget_run["steps"]
+    st.subheader("🎯 Carbon Budget Run")
+    if not df_steps["Within Budget"].iloc[-1]:
+        st.warning(f"⛔ Budget reached after {df_steps['Value'].iloc[-1]} trees/epochs — training stopped early.")
+    fig_budget = px.line(
+        df_steps, x="Emissions (g CO₂eq)", y="Accuracy (%)", markers=True, hover_data=["Value"],
+        title="Accuracy vs Cumulative Emissions",
+    )
+    fig_budget.add_vline(x=budget_run["budget_g"], line_dash="dash", annotation_text="Budget")
+    st.plotly_chart(fig_budget)
+
+# Scaling report: where extra cores pay for themselves in time and energy
+if "scaling_results" in st.session_state:
+    df_scaling = st.session_state.scaling_results
+    st.subheader("📏 Scaling Report: Rows × CPU Cores")
+    fig_time = px.line(
+        df_scaling, x="Cores", y="Wall Time (s)", color="Rows", markers=True,
+        title="Wall Time vs CPU Cores",
+    )
+    st.plotly_chart(fig_time)
+    fig_energy = px.line(
+        df_scaling, x="Cores", y="Energy vs Fewest Cores (%)", color="Rows", markers=True,
+        title="Energy Relative to the Fewest-Cores Run (below 100% = parallelism saves energy)",
+    )
+    fig_energy.add_hline(y=100, line_dash="dash")
+    st.plotly_chart(fig_energy)
+    st.dataframe(df_scaling, hide_index=True)
+
+# Inference benchmark: batch-size throughput and per-prediction cost by tree count
+if "inference_results" in st.session_state:
+    inference_results = st.session_state.inference_results
+    df_batches = inference_results["batches"]
+    st.subheader("📦 Inference Benchmark")
+    st.caption(inference_results["label"])
+    st.dataframe(df_batches, hide_index=True)
+    fig_batches = px.bar(
+        df_batches.astype({"Batch Size": str}), x="Batch Size", y="Emissions per 1k Predictions (g CO₂eq)",
+        hover_data=["Predictions/sec"], log_y=True, title="Emissions per 1,000 Predictions by Batch Size",
+    )
+    st.plotly_chart(fig_batches)
+    fig_trees = px.line(
+        inference_results["trees"], x="Trees", y="Emissions per 1k Predictions (g CO₂eq)", color="Model",
+        markers=True, hover_data=["Predictions/sec"],
+        title="Per-Prediction Cost: Random Forest Tree Count vs Logistic Regression",
+    )
+    st.plotly_chart(fig_trees)
+
+# Cross-validation: accuracy spread, per-fold emissions and strategy cost
+if "cv_results" in st.session_state:
+    cv_results = st.session_state.cv_results
+    df_folds = cv_results["folds"]
+    st.subheader("🔀 Cross-Validation Results")
+    st.caption(cv_results["label"])
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Mean Accuracy", f"{cv_results['mean_accuracy']:.2f}%")
+    col2.metric("Std Accuracy", f"± {cv_results['std_accuracy']:.2f}%")
+    col3.metric("Total Emissions", f"{cv_results['emissions_g']:.4f} g CO₂eq")
+    st.dataframe(df_folds, hide_index=True)
+    fig_folds = px.bar(df_folds, x="Fold", y="Emissions (g CO₂eq)", hover_data=["Accuracy (%)", "Duration (s)"], title="Emissions per Fold")
+    st.plotly_chart(fig_folds)
+
+    if "strategies" in cv_results:
+        st.markdown("**⚖️ Parallel vs Sequential Folds** (whole run, worker start-up included)")
+        df_strategies = cv_results["strategies"]
+        st.dataframe(df_strategies, hide_index=True)
+        greener = df_strategies.loc[df_strategies["Emissions (g CO₂eq)"].idxmin(), "Strategy"]
+        st.info(f"🌿 On this machine, **{greener.lower()}** folds emitted less CO₂ for this configuration.")
+
+# Sweep results: accuracy vs emissions with the Pareto frontier highlighted
+if "sweep_results" in st.session_state:
+    df_sweep = st.session_state.sweep_results
+    st.subheader("🧪 Sweep Results: Accuracy vs CO₂")
+    st.info(f"🌍 {len(df_sweep)} configurations emitted **{df_sweep.attrs['total_emissions_g']:.4f} g CO₂eq** in total (whole sweep, measured machine-wide).")
+    st.caption("Each configuration's emissions count only its own worker process, not the runs alongside it.")
+    fig_sweep = px.scatter(
+        df_sweep, x="Emissions (g CO₂eq)", y="Accuracy (%)", color="Pareto Optimal",
+        symbol="Model", facet_col="Dataset", hover_data=["Params"],
+        title="Accuracy vs Emissions per Configuration",
+    )
+    st.plotly_chart(fig_sweep)
+
+    st.markdown("**🏅 Pareto-optimal configurations** (no other run is both more accurate and greener)")
+    st.dataframe(df_sweep[df_sweep["Pareto Optimal"]].drop(columns=["Pareto Optimal", "Value"]), hide_index=True)
 
 # Previous runs table
-if st.session_state.logs:
+if not st.session_state.logs.empty:
     st.subheader("📋 Previous Runs")
-    df_logs = pd.DataFrame(st.session_state.logs)
-    st.dataframe(df_logs)
+    df_logs = st.session_state.logs
+    df_display = df_logs
+    if "latest" in calibration:
+        net = net_emissions(df_logs["Emissions (g CO₂eq)"], calibration["latest"])
+        df_display = df_logs.assign(**{
+            "Net Emissions (g CO₂eq)": net["net_g"],
+            "Net Low (g CO₂eq)": net["low_g"],
+            "Net High (g CO₂eq)": net["high_g"],
+        })
+    st.dataframe(
+        df_display,
+        column_config={
+            "Accuracy (%)": st.column_config.NumberColumn(format="%.4f"),
+            "Emissions (g CO₂eq)": st.column_config.NumberColumn(format="%.4f"),
+            "Net Emissions (g CO₂eq)": st.column_config.NumberColumn(format="%.3e"),
+            "Net Low (g CO₂eq)": st.column_config.NumberColumn(format="%.3e"),
+            "Net High (g CO₂eq)": st.column_config.NumberColumn(format="%.3e"),
+        },
+    )
 
     # Emissions Chart
     st.subheader("📈 Emissions Chart")
-    df_logs["Emissions (g CO₂eq)"] = df_logs["Emissions (g CO₂eq)"].astype(float)
     fig = px.line(df_logs, y="Emissions (g CO₂eq)", markers=True, title="Emissions per Training Run")
     st.plotly_chart(fig)
 
     # 🌿 Greenest configuration PER SELECTED DATASET
-    st.subheader(f"🌍 Greenest Configuration (for {dataset_name} dataset)")
-    filtered_df = df_logs[df_logs["Dataset"] == dataset_name]
-    if not filtered_df.empty:
-        min_emission_row = filtered_df.loc[filtered_df["Emissions (g CO₂eq)"].astype(float).idxmin()]
-        st.markdown(f"""
-        **Dataset:** {min_emission_row['Dataset']}  
-        **Model:** {min_emission_row['Model']}  
-        **Params:** {min_emission_row['Params']}  
-        **Accuracy:** {min_emission_row['Accuracy (%)']}  
-        **Emissions:** {min_emission_row['Emissions (g CO₂eq)']} g CO₂eq
-        """)
-    else:
-        st.info("No training runs for this dataset yet.")
+    for greenest_dataset in selected_datasets:
+        st.subheader(f"🌍 Greenest Configuration (for {greenest_dataset} dataset)")
+        filtered_df = df_logs[df_logs["Dataset"] == greenest_dataset]
+        if not filtered_df.empty:
+            min_emission_row = filtered_df.loc[filtered_df["Emissions (g CO₂eq)"].idxmin()]
+            st.markdown(f"""
+            **Dataset:** {min_emission_row['Dataset']}  
+            **Model:** {min_emission_row['Model']}  
+            **Params:** {min_emission_row['Params']}  
+            **Accuracy:** {min_emission_row['Accuracy (%)']:.4f}  
+            **Emissions:** {min_emission_row['Emissions (g CO₂eq)']:.4f} g CO₂eq
+            """)
+        else:
+            st.info("No training runs for this dataset yet.")
 
     # 🔁 Real-world CO₂ Equivalent for Latest Run
     st.subheader("📏 Real-world CO₂ Equivalent")
     latest_row = df_logs.iloc[-1]
-    latest_grams = float(latest_row["Emissions (g CO₂eq)"])
+    latest_grams = latest_row["Emissions (g CO₂eq)"]
     st.markdown(f"""
     **Dataset:** {latest_row['Dataset']}  
     **Model:** {latest_row['Model']}  
     **Params:** {latest_row['Params']}  
-    **Accuracy:** {latest_row['Accuracy (%)']}  
+    **Accuracy:** {latest_row['Accuracy (%)']:.4f}  
     **Emissions:** {latest_grams:.4f} g CO₂eq  
   
 - 📺 Watching YouTube (HD) for **{(latest_grams / 4) * 60:.4f} seconds**  
@@ -187,6 +721,48 @@ if st.session_state.logs:
 - 🚗 Driving **{latest_grams / 120:.6f} meters** in a petrol car 
 """)
 
+# What-if: the latest run's energy on every country's grid, without re-running it
+if "energy_kwh" in st.session_state.get("last_result", {}):
+    energy_kwh = st.session_state.last_result["energy_kwh"]
+    df_projection = project_emissions(energy_kwh)
+    here = default_service().sample().country_iso_code
+
+    st.subheader("🌐 Where Should It Run?")
+    st.caption(f"The latest run used {energy_kwh:.3e} kWh. This is what it would emit on each country's grid.")
+    fig_map = px.choropleth(
+        df_projection, locations="ISO Code", color="Emissions (g CO₂eq)", hover_name="Country",
+        hover_data=["Intensity (g CO₂eq/kWh)", "Renewables (%)", "Rank"], color_continuous_scale="RdYlGn_r",
+        title="Projected Emissions of the Latest Run by Country",
+    )
+    st.plotly_chart(fig_map)
+
+    current = df_projection[df_projection["ISO Code"] == here]
+    if not current.empty:
+        row = current.iloc[0]
+        greenest = df_projection.iloc[0]
+        st.markdown(
+            f"At the national average of this machine's country (**{row['Country']}**) it comes to **{row['Emissions (g CO₂eq)']:.3e} g CO₂eq**, "
+            f"rank {row['Rank']} of {len(df_projection)}. In **{greenest['Country']}** it would have been "
+            f"**{greenest['Emissions (g CO₂eq)']:.3e} g CO₂eq**."
+        )
+    col1, col2 = st.columns(2)
+    ranking_columns = ["Rank", "Country", "Intensity (g CO₂eq/kWh)", "Emissions (g CO₂eq)"]
+    col1.markdown("**🌿 Greenest grids**")
+    col1.dataframe(df_projection.head(10)[ranking_columns], hide_index=True)
+    col2.markdown("**🏭 Most carbon-intensive grids**")
+    col2.dataframe(df_projection.tail(10).iloc[::-1][ranking_columns], hide_index=True)
+
+# Latest rows of the shared emissions store (indexed, so this stays fast as it grows)
+with st.expander("🗄️ Recent Tracked Runs (all sessions)"):
+    # Runs are written in batches by a background writer; waiting for it here
+    # would block every rerun, so the latest runs may show up a moment later
+    st.caption(f"Runs appear here within about {FLUSH_INTERVAL:g} s of finishing.")
+    recent_runs = default_store().last_runs(10)
+    st.dataframe(
+        recent_runs[["timestamp", "project_name", "duration", "emissions", "energy_consumed", "country_name", "cpu_model"]],
+        hide_index=True,
+    )
+
 # List of "Did You Know?" fun facts
 did_you_know_facts = [
     "🌱 It would take 45 billion trees 🌳 a whole year to absorb 1 billion tonnes of CO₂!",
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from openai import OpenAI, OpenAIError
-from codecarbon import EmissionsTracker
+from tracker_service import new_tracker
 import random
 from theme import apply_theme
 
@@ -69,7 +69,7 @@ if openai_api_key and prompt:
             MAX_TOKENS = 500
 
             # Tracker for temperature 1.0 (normal model)
-            tracker_normal = EmissionsTracker(project_name="Temp 1.0")
+            tracker_normal = new_tracker(project_name="Temp 1.0")
             tracker_normal.start()
             response_normal = client.chat.completions.create(
                 model="gpt-4",
@@ -82,7 +82,7 @@ if openai_api_key and prompt:
             emissions_normal = tracker_normal.stop()
 
             # Tracker for temperature 0.2 (green model)
-            tracker_greenmodel = EmissionsTracker(project_name="Temp 0.2")
+            tracker_greenmodel = new_tracker(project_name="Temp 0.2")
             tracker_greenmodel.start()
             response_greenmodel = client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -1,7 +1,7 @@
 
 from openai import OpenAI, OpenAIError
 import streamlit as st
-from codecarbon import EmissionsTracker  # 🆕 Import CodeCarbon
+from tracker_service import new_tracker  # 🆕 CodeCarbon, via the app's shared tracker
 import random
 from theme import apply_theme
 
@@ -90,10 +90,9 @@ if prompt:
     st.chat_message("user").write(prompt)
 
     # Track emissions
-    tracker = EmissionsTracker(
+    tracker = new_tracker(
         project_name="GreenModel Chatbot" if green_mode else "Normal Chatbot",
-        measure_power_secs=1,
-        save_to_file=False
+        persist=False
     )
     tracker.start()
 
@@ -0,0 +1,90 @@
+import streamlit as st
+import plotly.express as px
+import os
+from theme import apply_theme
+from disk_cache import cache_key, default_cache, file_hash
+from emissions_store import DEFAULT_DB, LEGACY_CSV, default_store
+from emissions_writer import FLUSH_INTERVAL
+from run_history import GROUPINGS, aggregate_csv, aggregate_store, file_signature
+
+st.set_page_config(page_title="Run History Explorer", layout="centered")
+
+apply_theme()
+
+st.title("📚 Run History Explorer")
+
+with st.expander("📖 Run History Explorer User Guide"):
+    st.markdown("""
+    **ℹ️ User Guide**
+
+    **1. Choose a Source**
+    - `Emissions store`: every run tracked by the app (training page, headless experiments and Chatbot 1), across all sessions.
+    - `emissions.csv`: the legacy CodeCarbon log written by older versions of the app; new runs are no longer added to it.
+
+    **2. Group Runs**
+    - `Project`: which page or experiment the run came from.
+    - `Day`: how emissions add up over time.
+    - `Hardware`: the CPU the run was measured on.
+    - `Region`: the country whose electricity grid powered the run.
+
+    ---
+
+    **📝 Notes:** Logs are read in chunks, so even very large logs load without running out of memory.
+    Results are cached and refreshed as soon as new runs are logged.
+    """)
+
+sources = {"Emissions store": DEFAULT_DB, "emissions.csv": LEGACY_CSV}
+available = [name for name, path in sources.items() if os.path.exists(path)]
+
+if not available:
+    st.info("No tracked runs yet. Train a model or chat with a chatbot to start logging emissions.")
+    st.stop()
+
+source = st.radio("🗂️ Source", available, horizontal=True)
+label = st.radio("📊 Group by", list(GROUPINGS), horizontal=True)
+
+
+# The signature (file size and mtime) is part of the cache key, so appending
+# runs to a log invalidates its cached aggregates. CSV aggregates are also kept
+# in the shared disk cache under the file's content hash, for other processes
+# and restarts; the store's GROUP BY is cheaper than hashing the database.
+@st.cache_data(show_spinner=False)
+def load_aggregate(source, label, signature):
+    if source == "Emissions store":
+        return aggregate_store(default_store(), label)
+    path = sources[source]
+    return default_cache().frame(cache_key("run_history", label, file_hash(path)), lambda: aggregate_csv(path, label))
+
+
+if source == "Emissions store":
+    # Runs are written in batches by a background writer; waiting for it here
+    # would block every rerun, so the latest runs may show up a moment later
+    st.caption(f"Runs appear here within about {FLUSH_INTERVAL:g} s of finishing.")
+
+with st.spinner("Aggregating runs..."):
+    summary = load_aggregate(source, label, file_signature(sources[source]))
+
+if summary.empty:
+    st.info("This log has no runs yet.")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Runs", f"{int(summary['Runs'].sum()):,}")
+col2.metric("Energy", f"{summary['Energy (kWh)'].sum():.6f} kWh")
+col3.metric("Emissions", f"{summary['Emissions (g CO₂eq)'].sum():.4f} g CO₂eq")
+
+st.subheader(f"🌍 Emissions by {label}")
+if label == "Day":
+    fig = px.line(summary, x=label, y="Emissions (g CO₂eq)", markers=True)
+else:
+    fig = px.bar(summary.head(20), x=label, y="Emissions (g CO₂eq)", hover_data=["Runs", "Energy (kWh)"])
+st.plotly_chart(fig)
+
+st.dataframe(summary, hide_index=True)
+
+st.download_button(
+    "📥 Download Summary as CSV",
+    summary.to_csv(index=False),
+    file_name=f"emissions_by_{label.lower()}.csv",
+    mime="text/csv",
+)
@@ -0,0 +1,140 @@
+import glob
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+import pandas as pd
+import psutil
+
+# Package-level RAPL domains (intel-rapl:0, intel-rapl:1, ...; not their subdomains)
+RAPL_DOMAINS = "/sys/class/powercap/intel-rapl:*"
+
+SAMPLE_SECS = 0.1
+CAPACITY = 1200
+
+
+def _read_int(path):
+    with open(path) as f:
+        return int(f.read())
+
+
+class RaplEnergy:
+    # Cumulative CPU package energy in joules from the kernel's RAPL counters,
+    # which wrap around at max_energy_range_uj
+    name = "RAPL"
+
+    def __init__(self, domains):
+        self._domains = domains
+        self._max = [_read_int(os.path.join(d, "max_energy_range_uj")) for d in domains]
+        self._last = [_read_int(os.path.join(d, "energy_uj")) for d in domains]
+        self._total_j = 0.0
+
+    def read(self):
+        for i, domain in enumerate(self._domains):
+            now = _read_int(os.path.join(domain, "energy_uj"))
+            delta = now - self._last[i]
+            if delta < 0:
+                delta += self._max[i]
+            self._total_j += delta / 1e6
+            self._last[i] = now
+        return self._total_j
+
+
+class CpuLoadEnergy:
+    # Without RAPL: CPU TDP scaled by utilisation, integrated over time, the same
+    # estimate CodeCarbon falls back to
+    name = "CPU load × TDP"
+
+    def __init__(self, tdp_w):
+        self._tdp_w = tdp_w
+        psutil.cpu_percent(interval=None)
+        self._last = time.perf_counter()
+        self._total_j = 0.0
+
+    def read(self):
+        now = time.perf_counter()
+        self._total_j += self._tdp_w * psutil.cpu_percent(interval=None) / 100 * (now - self._last)
+        self._last = now
+        return self._total_j
+
+
+# CPU TDP as CodeCarbon detects it (slow, so looked up once per process)
+@lru_cache(maxsize=None)
+def _cpu_tdp_w():
+    from codecarbon.core.cpu import TDP
+    return TDP().tdp or 4 * (os.cpu_count() or 1)
+
+
+# RAPL when the counters are readable, otherwise the utilisation estimate
+def energy_source():
+    domains = [
+        d for d in sorted(glob.glob(RAPL_DOMAINS))
+        if os.path.basename(d).count(":") == 1 and os.access(os.path.join(d, "energy_uj"), os.R_OK)
+    ]
+    if domains:
+        try:
+            return RaplEnergy(domains)
+        except OSError:
+            pass
+    return CpuLoadEnergy(_cpu_tdp_w())
+
+
+class PowerSampler:
+    # Samples cumulative energy every `interval` seconds on a background thread.
+    # At most `capacity` samples are kept: the latest capacity/2 at full
+    # resolution in a ring buffer, and the run before that downsampled evenly
+    # (every stride-th sample, with the stride doubling whenever that half
+    # fills up). Energy is cumulative, so power over the wider gaps is still exact.
+
+    def __init__(self, interval=SAMPLE_SECS, capacity=CAPACITY):
+        self.interval = interval
+        self.capacity = capacity
+        self.source = None
+        self._recent = deque()
+        self._older = []
+        self._stride = 1
+        self._moved = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="power-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        source = energy_source()
+        self.source = source.name
+        started = time.perf_counter()
+        self._append(0.0, source.read())
+        while not self._stopped.wait(self.interval):
+            self._append(time.perf_counter() - started, source.read())
+        self._append(time.perf_counter() - started, source.read())
+
+    def _append(self, t, energy_j):
+        half = self.capacity // 2
+        with self._lock:
+            self._recent.append((t, energy_j))
+            if len(self._recent) <= half:
+                return
+            sample = self._recent.popleft()
+            if self._moved % self._stride == 0:
+                self._older.append(sample)
+                if len(self._older) > half:
+                    self._older = self._older[::2]
+                    self._stride *= 2
+            self._moved += 1
+
+    # Power over each interval and energy used since the start
+    def samples(self):
+        with self._lock:
+            df = pd.DataFrame(self._older + list(self._recent), columns=["Time (s)", "Energy (J)"])
+        df["Power (W)"] = df["Energy (J)"].diff() / df["Time (s)"].diff()
+        df["Energy (kWh)"] = (df["Energy (J)"] - df["Energy (J)"].iloc[0]) / 3.6e6 if len(df) else 0.0
+        return df.iloc[1:][["Time (s)", "Power (W)", "Energy (kWh)"]]
@@ -0,0 +1,30 @@
+from functools import lru_cache
+
+import pandas as pd
+from codecarbon.input import DataSource
+
+
+# Grid carbon intensity (g CO₂eq/kWh) per country from the energy-mix table
+# bundled with CodeCarbon, the same data the tracker uses offline. Loaded once
+# per process.
+@lru_cache(maxsize=None)
+def intensity_table():
+    mix = DataSource().get_global_energy_mix_data()
+    df = pd.DataFrame.from_dict(mix, orient="index")
+    df = pd.DataFrame({
+        "ISO Code": df["iso_code"],
+        "Country": df["country_name"],
+        "Intensity (g CO₂eq/kWh)": df["carbon_intensity"].astype(float),
+        "Renewables (%)": (df["renewables_TWh"] / df["total_TWh"] * 100).where(df["total_TWh"] > 0),
+        "Year": df["year"],
+    })
+    return df.sort_values("Intensity (g CO₂eq/kWh)", ignore_index=True)
+
+
+# A run's emissions had it used the same energy on every country's grid,
+# greenest first, with each country's rank
+def project_emissions(energy_kwh):
+    df = intensity_table().copy()
+    df["Emissions (g CO₂eq)"] = df["Intensity (g CO₂eq/kWh)"] * energy_kwh
+    df["Rank"] = df["Emissions (g CO₂eq)"].rank(method="min").astype(int)
+    return df
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+
+from emissions_writer import default_writer
+from sweep import SWEEP_PARAMS, build_grid, run_sweep
+from training import DATASETS, MODELS, SYNTHETIC_PREFIX, parse_synthetic
+
+DEFAULT_PROJECT = "experiments"
+
+
+# Experiment matrix from a YAML (.yaml/.yml) or JSON file
+def load_matrix(path):
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            import yaml
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+# Values as a list, or as {start, stop, step} with stop included (like the sweep slider)
+def _values(values):
+    if isinstance(values, dict):
+        return range(values["start"], values["stop"] + 1, values.get("step", 10))
+    return values
+
+
+# Reject bad configs here, where parser.error can report them, rather than in
+# the pool workers after the sweep has started
+def _check(config):
+    if config["dataset"].startswith(SYNTHETIC_PREFIX):
+        parse_synthetic(config["dataset"])
+    elif config["dataset"] not in DATASETS:
+        raise ValueError(f"Unknown dataset {config['dataset']!r}; use one of {list(DATASETS)} or '{SYNTHETIC_PREFIX} <rows>x<features>'")
+    if config["model"] not in MODELS:
+        raise ValueError(f"Unknown model {config['model']!r}; use one of {MODELS}")
+    param_name = SWEEP_PARAMS[config["model"]]
+    value = config["params"].get(param_name)
+    if set(config["params"]) != {param_name} or not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"{config['model']} takes params {{{param_name!r}: <positive int>}}, got {config['params']}")
+    return config
+
+
+# Run configs of a matrix: the datasets × models × values grid, plus any
+# explicit `runs` entries ({dataset, model, params})
+def build_configs(matrix):
+    configs = []
+    if "datasets" in matrix or "models" in matrix or "values" in matrix:
+        configs += build_grid(matrix.get("datasets"), matrix.get("models"), _values(matrix.get("values", [100])))
+    configs += [{"dataset": run["dataset"], "model": run["model"], "params": dict(run["params"])} for run in matrix.get("runs", [])]
+    return [_check(config) for config in configs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a matrix of tracked training experiments in parallel and log them to the emissions store.",
+    )
+    parser.add_argument("matrix", help="YAML or JSON experiment matrix")
+    parser.add_argument("--workers", type=int, help="worker processes (default: matrix max_workers, else one per CPU)")
+    parser.add_argument("--project", help=f"project name for the logged runs (default: matrix project_name, else {DEFAULT_PROJECT!r})")
+    parser.add_argument("--output", help="also write the results table to this CSV file")
+    args = parser.parse_args(argv)
+
+    matrix = load_matrix(args.matrix)
+    try:
+        configs = build_configs(matrix)
+    except (KeyError, ValueError) as e:
+        parser.error(f"invalid matrix {args.matrix}: {e}")
+    if not configs:
+        parser.error(f"{args.matrix} defines no runs")
+
+    project_name = args.project or matrix.get("project_name", DEFAULT_PROJECT)
+    print(f"Running {len(configs)} configurations as project {project_name!r}...", file=sys.stderr)
+    results = run_sweep(
+        configs,
+        max_workers=args.workers or matrix.get("max_workers"),
+        incremental=matrix.get("incremental", False),
+        project_name=project_name,
+    )
+    default_writer().flush()
+    print(f"Sweep emitted {results.attrs['total_emissions_g']:.6f} g CO₂eq in total.", file=sys.stderr)
+
+    print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
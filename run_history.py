@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+
+# Dimensions runs can be grouped by, as emissions log columns ("day" is derived from timestamp)
+GROUPINGS = {
+    "Project": "project_name",
+    "Day": "day",
+    "Hardware": "cpu_model",
+    "Region": "country_name",
+}
+
+# Summed per group: emissions log column -> report column
+SUMS = {
+    "duration": "Duration (s)",
+    "energy_consumed": "Energy (kWh)",
+    "cpu_energy": "CPU Energy (kWh)",
+    "ram_energy": "RAM Energy (kWh)",
+    "emissions": "Emissions (g CO₂eq)",
+}
+
+CHUNK_ROWS = 100_000
+
+
+# Size and modification time of a log and its side files (SQLite keeps recent
+# writes in -wal): changes whenever new runs land, so it works as a cache key
+def file_signature(path):
+    signature = []
+    for candidate in (path, path + "-wal"):
+        if os.path.exists(candidate):
+            stat = os.stat(candidate)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+# Per-group totals in report form: grams instead of kg, runs counted, average per run
+def _finish(totals, label):
+    totals = totals.reset_index().rename(columns={"key": label, **SUMS})
+    totals["Emissions (g CO₂eq)"] *= 1000
+    totals["Avg Emissions per Run (g CO₂eq)"] = totals["Emissions (g CO₂eq)"] / totals["Runs"]
+    sort_by = label if label == "Day" else "Emissions (g CO₂eq)"
+    return totals.sort_values(sort_by, ascending=label == "Day", ignore_index=True)
+
+
+# Aggregate a CodeCarbon CSV chunk by chunk: only the needed columns are read
+# and only running per-group sums are kept, so memory doesn't grow with the file
+def aggregate_csv(path, label, chunksize=CHUNK_ROWS):
+    column = GROUPINGS[label]
+    source = "timestamp" if column == "day" else column
+    wanted = {source, *SUMS}
+
+    totals = None
+    for chunk in pd.read_csv(path, usecols=lambda c: c in wanted, chunksize=chunksize):
+        if column == "day":
+            key = pd.to_datetime(chunk[source], errors="coerce", format="ISO8601").dt.strftime("%Y-%m-%d")
+        else:
+            key = chunk[source]
+        chunk = chunk.reindex(columns=list(SUMS)).assign(key=key.fillna("Unknown"), Runs=1)
+        partial = chunk.groupby("key").sum(min_count=0)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None:
+        return pd.DataFrame(columns=[label, *SUMS.values(), "Runs"])
+    return _finish(totals, label)
+
+
+# Aggregate the SQLite emissions store; SQLite streams the GROUP BY itself
+def aggregate_store(store, label):
+    column = GROUPINGS[label]
+    key = "substr(timestamp, 1, 10)" if column == "day" else column
+    sums = ", ".join(f"TOTAL({c}) AS {c}" for c in SUMS)
+    totals = store.query(
+        f"SELECT COALESCE({key}, 'Unknown') AS key, {sums}, COUNT(*) AS Runs FROM emissions GROUP BY 1"
+    )
+    return _finish(totals.set_index("key"), label)
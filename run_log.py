@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+
+from emissions_store import DEFAULT_DB, connect
+
+# Typed columns of the runs table; accuracy is a fraction, emissions are in grams
+COLUMNS = {
+    "dataset": "TEXT",
+    "model": "TEXT",
+    "params": "TEXT",
+    "accuracy": "REAL",
+    "emissions_g": "REAL",
+}
+
+# Report names used by the tracker page
+DISPLAY_NAMES = {
+    "dataset": "Dataset",
+    "model": "Model",
+    "params": "Params",
+    "accuracy": "Accuracy (%)",
+    "emissions_g": "Emissions (g CO₂eq)",
+}
+
+
+class RunLog:
+    # Durable log of training results, kept in the emissions database. Runs are
+    # grouped into named logs, so a session can pick its history back up after a
+    # reconnect and a team can share one log by using the same name.
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, log TEXT NOT NULL, "
+                f"timestamp TEXT, {', '.join(f'{c} {t}' for c, t in COLUMNS.items())})"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_log ON runs (log, id)")
+
+    def _connect(self):
+        return connect(self.path)
+
+    # Add runs (dicts keyed by COLUMNS) to a log in one transaction; returns their ids
+    def append(self, log, records):
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._connect() as conn:
+            return [
+                conn.execute(
+                    f"INSERT INTO runs (log, timestamp, {', '.join(COLUMNS)}) VALUES (?, ?, {placeholders})",
+                    (log, timestamp, *(record[c] for c in COLUMNS)),
+                ).lastrowid
+                for record in records
+            ]
+
+    # Runs of a log with id > after_id, oldest first, numeric and with report
+    # column names (accuracy as a percentage), indexed by run id
+    def read(self, log, after_id=0):
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT id, {', '.join(COLUMNS)} FROM runs WHERE log = ? AND id > ? ORDER BY id",
+                conn, params=(log, after_id), index_col="id",
+            )
+        df = df.astype({"accuracy": float, "emissions_g": float})
+        df["accuracy"] *= 100
+        return df.rename(columns=DISPLAY_NAMES)
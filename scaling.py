@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+
+from training import split_data, synthetic_name, train_model
+
+DEFAULT_CORES = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+# Wall time, energy and emissions of a Random Forest fit for every
+# (rows, cores) pair, run one after another so runs don't compete for cores.
+def scaling_report(row_counts, core_counts=DEFAULT_CORES, n_features=20, n_estimators=100):
+    rows = []
+    for n_rows in row_counts:
+        dataset_name = synthetic_name(n_rows, n_features)
+        # Generate and split the data before timing, so the first (baseline) run
+        # doesn't also pay for it
+        split_data(dataset_name)
+        for cores in sorted(core_counts):
+            result = train_model(dataset_name, "Random Forest", {"n_estimators": n_estimators}, n_jobs=cores)
+            rows.append({
+                "Rows": n_rows,
+                "Cores": cores,
+                "Wall Time (s)": result["duration_s"],
+                "Energy (kWh)": result["energy_kwh"],
+                "Emissions (g CO₂eq)": result["emissions_g"],
+                "Accuracy (%)": result["accuracy"] * 100,
+            })
+
+    df = pd.DataFrame(rows)
+    # Relative to the fewest-cores run of the same size: >1 speedup is faster,
+    # <100% energy means the extra cores also saved energy
+    baseline = df.groupby("Rows").transform("first")
+    df["Speedup"] = baseline["Wall Time (s)"] / df["Wall Time (s)"]
+    df["Energy vs Fewest Cores (%)"] = df["Energy (kWh)"] / baseline["Energy (kWh)"] * 100
+    return df
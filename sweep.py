@@ -0,0 +1,109 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import tracker_service
+from training import DATASETS, MODELS, new_tracker, train_model, format_params
+from tracker_service import DEFAULT_PROJECT
+
+# Hyperparameter swept for each model
+SWEEP_PARAMS = {
+    "Random Forest": "n_estimators",
+    "Logistic Regression": "max_iter",
+}
+DEFAULT_VALUES = range(10, 201, 10)
+
+
+# Every (dataset, model, value) combination as a run config
+def build_grid(datasets=None, models=None, values=DEFAULT_VALUES):
+    configs = []
+    for dataset_name in datasets or list(DATASETS):
+        for model_type in models or MODELS:
+            for value in values:
+                configs.append({
+                    "dataset": dataset_name,
+                    "model": model_type,
+                    "params": {SWEEP_PARAMS[model_type]: int(value)},
+                })
+    return configs
+
+
+# Pool worker start-up: chains run side by side, so each worker measures only
+# its own process's share of the machine rather than its neighbours' load too
+def _init_worker():
+    tracker_service.TRACKING_MODE = "process"
+
+
+# Worker entry point: configs of one dataset/model in ascending order, each with
+# its own emissions measurement. Each step warm-starts from the previous model
+# when incremental, so the chain fits every tree/iteration once instead of once
+# per config.
+def _run_chain(configs, incremental, project_name=DEFAULT_PROJECT):
+    rows = []
+    model = None
+    cumulative_g = 0.0
+    for config in configs:
+        result = train_model(config["dataset"], config["model"], config["params"], base_model=model, project_name=project_name)
+        if incremental:
+            model = result["model"]
+            cumulative_g += result["emissions_g"]
+        else:
+            cumulative_g = result["emissions_g"]
+        rows.append({
+            "Dataset": config["dataset"],
+            "Model": config["model"],
+            "Params": format_params(config["model"], config["params"]),
+            "Value": next(iter(config["params"].values())),
+            "Accuracy (%)": result["accuracy"] * 100,
+            # What it costs to have this config trained, and what this step emitted
+            "Emissions (g CO₂eq)": cumulative_g,
+            "Run Emissions (g CO₂eq)": result["emissions_g"],
+        })
+    return rows
+
+
+# Split configs into the units of work sent to the pool
+def _chains(configs, incremental):
+    if not incremental:
+        return [[config] for config in configs]
+    chains = {}
+    for config in configs:
+        chains.setdefault((config["dataset"], config["model"]), []).append(config)
+    return [sorted(chain, key=lambda c: tuple(c["params"].values())) for chain in chains.values()]
+
+
+# Run all configs in a process pool and return one row per config; every run
+# is logged to the emissions store under project_name. Per-config emissions are
+# each worker's own process share; the whole sweep (pool start-up included) is
+# measured machine-wide in this process and returned in
+# df.attrs["total_emissions_g"], not logged, since the runs already are.
+def run_sweep(configs, max_workers=None, incremental=False, project_name=DEFAULT_PROJECT):
+    # spawn keeps workers clear of the parent's tracker and server threads
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    tracker = new_tracker(project_name, persist=False)
+    tracker.start()
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_init_worker) as executor:
+            futures = [executor.submit(_run_chain, chain, incremental, project_name) for chain in _chains(configs, incremental)]
+            for future in as_completed(futures):
+                rows.extend(future.result())
+    finally:
+        emissions_kg = tracker.stop()
+
+    df = pd.DataFrame(rows).sort_values(["Dataset", "Model", "Value"], ignore_index=True)
+    df["Pareto Optimal"] = pareto_front(df)
+    df.attrs["total_emissions_g"] = emissions_kg * 1000
+    return df
+
+
+# Configs that no other config beats on both accuracy (higher) and emissions (lower).
+# Computed per dataset, since accuracies aren't comparable across datasets.
+def pareto_front(df, accuracy_col="Accuracy (%)", emissions_col="Emissions (g CO₂eq)"):
+    on_front = pd.Series(False, index=df.index)
+    for _, group in df.groupby("Dataset"):
+        ordered = group.sort_values([emissions_col, accuracy_col], ascending=[True, False])
+        best_so_far = ordered[accuracy_col].cummax().shift(fill_value=float("-inf"))
+        on_front[ordered.index[ordered[accuracy_col] > best_so_far]] = True
+    return on_front
@@ -0,0 +1,146 @@
+import dataclasses
+import os
+import threading
+import uuid
+from functools import lru_cache
+from multiprocessing.util import Finalize
+
+from codecarbon import EmissionsTracker, OfflineEmissionsTracker
+
+from emissions_writer import WriterOutput
+
+# ISO 3166 alpha-3 code (e.g. "CAN") of the grid this host runs on. When set,
+# carbon intensity comes from CodeCarbon's bundled data and no geolocation
+# request is made.
+COUNTRY_ISO_CODE = os.environ.get("GREENMODEL_COUNTRY_ISO_CODE")
+
+MEASURE_POWER_SECS = 1
+
+# Tracking mode of the process's service: "machine" measures the whole host,
+# "process" only this process's share (set by pool workers running side by side)
+TRACKING_MODE = "machine"
+DEFAULT_PROJECT = "codecarbon"
+
+# Cumulative fields a run's share is computed from: end value minus start value
+ENERGY_FIELDS = ("emissions", "cpu_energy", "gpu_energy", "ram_energy", "energy_consumed", "water_consumed")
+
+
+# Relies on CodeCarbon internals (tested with 3.3.x, pinned in requirements.txt):
+# the tracker methods _measure_power_and_energy and _prepare_emissions_data, its
+# _scheduler and _scheduler_monitor_power attributes, and the EmissionsData
+# fields in ENERGY_FIELDS (water_consumed included)
+class TrackerService:
+    # One CodeCarbon tracker per process, started once: hardware detection,
+    # geolocation and carbon-intensity setup happen here and never again.
+    # Runs measure through handles, which read the tracker's running totals at
+    # their start and end. Totals are only advanced by sample(), under a lock,
+    # from the handles and from the service's own sampling thread (CodeCarbon's
+    # schedulers are stopped so nothing else touches them).
+
+    def __init__(self, country_iso_code=COUNTRY_ISO_CODE, measure_power_secs=MEASURE_POWER_SECS, tracking_mode="machine"):
+        options = dict(
+            project_name=DEFAULT_PROJECT, measure_power_secs=measure_power_secs, log_level="error",
+            save_to_file=False, output_handlers=[], allow_multiple_runs=True, tracking_mode=tracking_mode,
+        )
+        if country_iso_code:
+            self._tracker = OfflineEmissionsTracker(country_iso_code=country_iso_code, **options)
+        else:
+            self._tracker = EmissionsTracker(**options)
+        self._tracker.start()
+        for scheduler in ("_scheduler", "_scheduler_monitor_power"):
+            if getattr(self._tracker, scheduler, None) is not None:
+                getattr(self._tracker, scheduler).stop()
+                setattr(self._tracker, scheduler, None)
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._interval = measure_power_secs
+        self._thread = threading.Thread(target=self._run, name="tracker-service", daemon=True)
+        self._thread.start()
+        Finalize(self, self.close, exitpriority=5)
+
+    # Bring the totals up to now and return them (CodeCarbon's EmissionsData,
+    # cumulative since the service started)
+    def sample(self):
+        with self._lock:
+            self._tracker._measure_power_and_energy()
+            return self._tracker._prepare_emissions_data()
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self.sample()
+
+    def handle(self, project_name=DEFAULT_PROJECT, output_handlers=()):
+        return RunHandle(self, project_name, output_handlers)
+
+    def close(self):
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._thread.join()
+            self._tracker.stop()
+
+
+# Measurement of one run against the shared tracker. Mirrors the parts of the
+# EmissionsTracker API the app uses (start, flush, start_task/stop_task, stop,
+# final_emissions_data), so it drops in wherever a tracker was used. Like
+# separate trackers, concurrent handles each see the whole machine's energy.
+class RunHandle:
+    def __init__(self, service, project_name, output_handlers):
+        self._service = service
+        self._project_name = project_name
+        self._output_handlers = list(output_handlers)
+        self._start = None
+        self._tasks = {}
+        self.run_id = str(uuid.uuid4())
+        self.final_emissions_data = None
+
+    def start(self):
+        self._start = self._service.sample()
+
+    # What the run has used since `since`, as an EmissionsData row
+    def _since(self, since, run_id=None):
+        now = self._service.sample()
+        duration = now.duration - since.duration
+        changes = {field: getattr(now, field) - getattr(since, field) for field in ENERGY_FIELDS}
+        return dataclasses.replace(
+            now,
+            project_name=self._project_name,
+            run_id=run_id or self.run_id,
+            duration=duration,
+            emissions_rate=changes["emissions"] / duration if duration > 0 else 0.0,
+            # Average power over the run, from the energy it used (kWh -> W)
+            cpu_power=changes["cpu_energy"] * 3.6e6 / duration if duration > 0 else 0.0,
+            gpu_power=changes["gpu_energy"] * 3.6e6 / duration if duration > 0 else 0.0,
+            ram_power=changes["ram_energy"] * 3.6e6 / duration if duration > 0 else 0.0,
+            **changes,
+        )
+
+    # Emissions so far, in kg, without ending the run
+    def flush(self):
+        return self._since(self._start).emissions
+
+    def start_task(self, task_name):
+        self._tasks[task_name] = self._service.sample()
+
+    def stop_task(self, task_name):
+        return self._since(self._tasks.pop(task_name), run_id=str(uuid.uuid4()))
+
+    # End the run, hand its row to the output handlers and return its emissions in kg
+    def stop(self):
+        data = self._since(self._start)
+        for handler in self._output_handlers:
+            handler.out(data, data)
+        self.final_emissions_data = data
+        return data.emissions
+
+
+# The tracker service of this process, started on first use
+@lru_cache(maxsize=None)
+def default_service():
+    return TrackerService(tracking_mode=TRACKING_MODE)
+
+
+# Handle for one run. persist=False measures without writing a row, for
+# sub-measurements of a run that is logged as a whole.
+def new_tracker(project_name=DEFAULT_PROJECT, persist=True):
+    return default_service().handle(project_name, [WriterOutput()] if persist else [])
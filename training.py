@@ -0,0 +1,281 @@
+import copy
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+from sklearn.datasets import load_iris, load_wine, load_breast_cancer, make_classification
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+
+from disk_cache import DiskCache, cache_key
+from tracker_service import DEFAULT_PROJECT, new_tracker
+
+# Available datasets and models
+DATASETS = {
+    "Iris": load_iris,
+    "Wine": load_wine,
+    "Breast Cancer": load_breast_cancer,
+}
+MODELS = ["Random Forest", "Logistic Regression"]
+
+# Synthetic datasets are named by size, e.g. "Synthetic 100000x20"
+SYNTHETIC_PREFIX = "Synthetic"
+SYNTHETIC_ROWS = [10_000, 100_000, 1_000_000, 5_000_000]
+
+# Optional disk cache directory for splits, memory-mapped so every process on the
+# host shares one copy through the page cache. Unset means in-process caching only.
+DATA_STORE_DIR = os.environ.get("GREENMODEL_DATA_STORE")
+
+# Bytes of datasets and splits kept in memory per process (one large synthetic
+# dataset can be gigabytes). Memory-mapped splits don't count: they live in the
+# page cache.
+DATA_CACHE_BYTES = int(os.environ.get("GREENMODEL_DATA_CACHE_BYTES", 1024**3))
+
+# Seed for model construction, so repeated configs give comparable results
+DEFAULT_SEED = 42
+
+
+# Cached arrays are shared by every session, so they are made read-only
+def _freeze(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+def synthetic_name(n_rows, n_features):
+    return f"{SYNTHETIC_PREFIX} {n_rows}x{n_features}"
+
+
+# (rows, features) of a synthetic dataset name; ValueError if malformed
+def parse_synthetic(name):
+    match = re.fullmatch(rf"{SYNTHETIC_PREFIX} (\d+)x(\d+)", name)
+    if not match or int(match[1]) < 10 or int(match[2]) < 2:
+        raise ValueError(f"Invalid synthetic dataset {name!r}; use '{SYNTHETIC_PREFIX} <rows>x<features>' with at least 10 rows and 2 features")
+    return int(match[1]), int(match[2])
+
+
+# Fixed-seed classification problem of the requested size. float32 halves memory
+# and is what the tree builders convert to anyway.
+def _make_synthetic(name):
+    n_rows, n_features = parse_synthetic(name)
+    X, y = make_classification(
+        n_samples=n_rows, n_features=n_features, n_informative=max(2, n_features // 2),
+        random_state=DEFAULT_SEED,
+    )
+    return X.astype(np.float32), y
+
+
+class _DataCache:
+    # Array tuples evicted least recently used first once their in-memory size
+    # passes max_bytes; a tuple larger than that on its own isn't kept at all.
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+        arrays = compute()
+        size = sum(array.nbytes for array in arrays if not isinstance(array, np.memmap))
+        if size > self.max_bytes:
+            return arrays
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (arrays, size)
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return arrays
+
+
+_data_cache = _DataCache(DATA_CACHE_BYTES)
+
+
+def _load(name):
+    if name.startswith(SYNTHETIC_PREFIX):
+        return _freeze(*_make_synthetic(name))
+    data = DATASETS[name]()
+    return _freeze(data.data, data.target)
+
+
+# Load dataset (parsed once per process while it fits in the data cache)
+def load_data(name):
+    return _data_cache.get(("load", name), lambda: _load(name))
+
+
+# Fixed-seed train/test split, cached per (dataset, split parameters)
+def split_data(name, test_size=0.2, random_state=42):
+    def split():
+        X, y = load_data(name)
+        return train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    key = ("split", name, test_size, random_state)
+    if DATA_STORE_DIR:
+        return _data_cache.get(key, lambda: _split_store().arrays(cache_key(*key), split))
+    return _data_cache.get(key, lambda: _freeze(*split()))
+
+
+@lru_cache(maxsize=None)
+def _split_store():
+    return DiskCache(DATA_STORE_DIR)
+
+
+# Build an untrained model from the page's parameters
+# n_jobs only changes how many cores a forest uses, never the fitted model (so
+# warm starts can reuse a model trained on any core count; results are keyed by it).
+def build_model(model_type, params, seed=DEFAULT_SEED, n_jobs=None):
+    if model_type == "Random Forest":
+        return RandomForestClassifier(n_estimators=params["n_estimators"], random_state=seed, n_jobs=n_jobs)
+    return LogisticRegression(max_iter=params["max_iter"], random_state=seed)
+
+
+# Copy of a fitted model that, when fit again, trains only the extra trees or
+# iterations needed to reach params (warm start). Random Forest with a fixed seed
+# grows exactly the trees a fresh fit would; Logistic Regression resumes from the
+# previous coefficients.
+def extend_model(base_model, model_type, params):
+    model = copy.deepcopy(base_model)
+    if model_type == "Random Forest":
+        model.set_params(warm_start=True, n_estimators=params["n_estimators"])
+    else:
+        model.set_params(warm_start=True, max_iter=params["max_iter"] - base_model.max_iter)
+    return model
+
+
+# Human-readable parameter summary, e.g. "Trees: 100"
+def format_params(model_type, params):
+    if model_type == "Random Forest":
+        return f"Trees: {params['n_estimators']}"
+    return f"Epochs: {params['max_iter']}"
+
+
+# Training phases measured separately by train_model
+PHASES = ("Data Load", "Fit", "Predict", "Evaluate")
+
+
+# Measure one phase of a tracked run as a task of its handle
+@contextmanager
+def track_phase(tracker, name, phases):
+    tracker.start_task(name)
+    start = len(phases)
+    try:
+        yield
+    finally:
+        data = tracker.stop_task(name)
+        if data is not None and len(phases) == start:
+            phases.append({
+                "Phase": name,
+                "Duration (s)": data.duration,
+                "Energy (kWh)": data.energy_consumed,
+                "Emissions (g CO₂eq)": data.emissions * 1000,
+            })
+
+
+# Train function
+# Each call gets its own handle on the process's tracker service, so concurrent jobs never share a measurement.
+# With base_model, only the additional work is trained and measured.
+# Each phase (data load, fit, predict, evaluate) is also measured on its own.
+def train_model(dataset_name, model_type, params, seed=DEFAULT_SEED, base_model=None, n_jobs=None, project_name=DEFAULT_PROJECT):
+    if base_model is None:
+        model = build_model(model_type, params, seed, n_jobs)
+    else:
+        model = extend_model(base_model, model_type, params)
+        if model_type == "Random Forest":
+            model.set_params(n_jobs=n_jobs)
+
+    tracker = new_tracker(project_name)
+    tracker.start()
+    started = time.perf_counter()
+    phases = []
+    try:
+        with track_phase(tracker, "Data Load", phases):
+            X_train, X_test, y_train, y_test = split_data(dataset_name)
+        with track_phase(tracker, "Fit", phases):
+            model.fit(X_train, y_train)
+        with track_phase(tracker, "Predict", phases):
+            preds = model.predict(X_test)
+        with track_phase(tracker, "Evaluate", phases):
+            acc = accuracy_score(y_test, preds)
+    finally:
+        emissions_kg = tracker.stop()
+    duration_s = time.perf_counter() - started
+
+    # Record the total parameter value, so the model can be extended again later
+    model.set_params(warm_start=False, **params)
+    return {
+        "accuracy": acc,
+        "emissions_g": emissions_kg * 1000,
+        "energy_kwh": tracker.final_emissions_data.energy_consumed,
+        "duration_s": duration_s,
+        "phases": phases,
+        "model": model,
+    }
+
+
+# Carbon-budget training: grow the model in chunks of trees (Random Forest) or
+# epochs (Logistic Regression), reading the live emissions after each chunk, and
+# stop once the budget is spent or params is reached. Returns the most accurate
+# checkpoint whose cumulative emissions were still within budget.
+def train_within_budget(dataset_name, model_type, params, budget_g, chunk=10, seed=DEFAULT_SEED, n_jobs=None):
+    X_train, X_test, y_train, y_test = split_data(dataset_name)
+    param_name, max_value = next(iter(params.items()))
+    model = build_model(model_type, {param_name: min(chunk, max_value)}, seed, n_jobs)
+    model.set_params(warm_start=True)
+
+    tracker = new_tracker()
+    tracker.start()
+    steps = []
+    best = None
+    try:
+        value = 0
+        while value < max_value:
+            previous, value = value, min(value + chunk, max_value)
+            if model_type == "Random Forest":
+                model.set_params(n_estimators=value)
+            else:
+                # Each warm-started fit runs max_iter more epochs
+                model.set_params(max_iter=value - previous)
+            model.fit(X_train, y_train)
+            acc = accuracy_score(y_test, model.predict(X_test))
+            emissions_g = (tracker.flush() or 0.0) * 1000
+
+            within_budget = emissions_g <= budget_g
+            steps.append({"Value": value, "Accuracy (%)": acc * 100, "Emissions (g CO₂eq)": emissions_g, "Within Budget": within_budget})
+            # On ties the later (larger) checkpoint wins: its cost is already paid
+            if (within_budget or best is None) and (best is None or acc >= best["accuracy"]):
+                # Forest checkpoints are a tree count (a prefix of the forest); linear checkpoints are a copy
+                best = {"accuracy": acc, "value": value, "model": model if model_type == "Random Forest" else copy.deepcopy(model)}
+            if not within_budget:
+                break
+    finally:
+        emissions_kg = tracker.stop()
+
+    best_model = best["model"]
+    if model_type == "Random Forest":
+        best_model.estimators_ = best_model.estimators_[:best["value"]]
+        best_model.set_params(n_estimators=best["value"])
+    else:
+        best_model.set_params(max_iter=best["value"])
+    best_model.set_params(warm_start=False)
+
+    return {
+        "accuracy": best["accuracy"],
+        "emissions_g": emissions_kg * 1000,
+        "model": best_model,
+        "best_params": {param_name: best["value"]},
+        "stopped_early": steps[-1]["Value"] < max_value,
+        "steps": steps,
+    }